@@ -1,21 +1,18 @@
 import sys
 import os
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSize, QTimer, QPropertyAnimation, QEasingCurve, pyqtProperty
+from PyQt6.QtCore import (
+    Qt, QThread, pyqtSignal, QSize, QTimer, QPropertyAnimation, QEasingCurve, pyqtProperty,
+    QAbstractListModel, QModelIndex, QObject,
+)
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFrame, QStackedWidget, QButtonGroup,
     QLineEdit, QComboBox, QProgressBar, QSpacerItem, QSizePolicy,
     QMessageBox, QScrollArea, QDialog, QCheckBox, QFormLayout,
-    QListWidget, QListWidgetItem, QRadioButton, QFileDialog,
+    QListWidget, QListWidgetItem, QRadioButton, QFileDialog, QListView, QSpinBox, QInputDialog,
 )
 from PyQt6.QtGui import QPixmap, QCursor, QIcon, QPainter, QBrush, QPen, QLinearGradient, QColor
-from minecraft_launcher_lib.utils import get_minecraft_directory, get_version_list
-from minecraft_launcher_lib.install import install_minecraft_version
-from minecraft_launcher_lib.command import get_minecraft_command
 from packaging import version
-from tqdm import tqdm
-from pypresence import Presence
-from random_username.generate import generate_username
 from uuid import uuid1
 import subprocess
 import requests
@@ -25,7 +22,22 @@ import json
 import shutil
 import time
 
-CONFIG_FILE = "settings.json"
+from launcher_core.cds import get_cds_manager
+from launcher_core.cleanup import KIND_ASSETS, KIND_LIBRARIES, KIND_NATIVES, KIND_RUNTIMES, KIND_STORE, collect_garbage
+from launcher_core.config import configure_downloads, load_config, update_config
+from launcher_core.download_manager import PRIORITY_NORMAL, get_download_manager
+from launcher_core.install import install_version, read_game_language
+from launcher_core.instances import get_instance_manager
+from launcher_core.java import get_java_manager
+from launcher_core.jvm import GC_CHOICES, GC_DEFAULT, get_jvm_arguments, get_jvm_profile, get_version_java_major
+from launcher_core.launch import generate_offline_username, get_launch_command
+from launcher_core.manifest import get_manifest_cache
+from launcher_core.paths import get_minecraft_directory, prepare_minecraft_directory
+from launcher_core.prefetch import configure_prefetch, get_prefetcher
+from launcher_core.process import STATE_CRASHED, STATE_EXITED, STATE_RUNNING, get_process_supervisor
+from launcher_core.progress import ProgressAggregator
+from launcher_core.repair import installed_versions, repair_versions
+from launcher_core.versions import get_all_versions
 
 translations = {
     "ru": {
@@ -36,14 +48,55 @@ translations = {
         "minecraft-launcher-lib (default)": "minecraft-launcher-lib (по умолчанию)",
         "Java (specify path)": "Java (указать путь)",
         "Java path (if Java is selected):": "Путь к Java (если выбран Java):",
+        "Java path (empty = detect automatically):": "Путь к Java (пусто — найти автоматически):",
         "Browse Java path": "Выбрать путь к Java",
+        "Download speed limit (KB/s, 0 = unlimited):": "Ограничение скорости загрузки (КБ/с, 0 — без ограничения):",
+        "JVM profile for:": "Профиль JVM для:",
+        "Start the game before sounds and other assets finish downloading": "Запускать игру, не дожидаясь загрузки звуков и других ассетов",
+        "Download new releases and version updates in the background": "Скачивать новые релизы и обновления версий в фоне",
+        "Background download speed limit (KB/s, 0 = unlimited):": "Лимит скорости фоновой загрузки (КБ/с, 0 — без ограничения):",
+        "All versions": "Все версии",
+        "Memory (MB, 0 = auto):": "Память (МБ, 0 — автоматически):",
+        "Garbage collector:": "Сборщик мусора:",
+        "JVM default": "По умолчанию JVM",
+        "Extra JVM arguments:": "Дополнительные аргументы JVM:",
+        "Startup: {cds} with CDS, {plain} without": "Запуск: {cds} с CDS, {plain} без",
+        "Game starting...": "Игра запускается...",
+        "Game running ({seconds:.1f} s to start)": "Игра запущена (старт за {seconds:.1f} с)",
+        "Game crashed (exit code {code})": "Игра упала (код {code})",
+        "Game exited": "Игра закрыта",
+        "New instance": "Новый экземпляр",
+        "Delete instance": "Удалить экземпляр",
+        "Default (.minecraft)": "Основной (.minecraft)",
+        "Instance name:": "Имя экземпляра:",
+        "Delete instance {name} with its worlds and mods?": "Удалить экземпляр {name} вместе с мирами и модами?",
         "Page backgrounds:": "Фоны страниц:",
         "Save settings": "Сохранить настройки",
 
         # --- MinecraftPage ---
         "Play": "Играть",
+        "Repair version": "Проверить версию",
+        "Repair all versions": "Проверить все версии",
+        "Repair finished": "Проверка завершена",
+        "Clean up unused files": "Удалить неиспользуемые файлы",
+        "Cleanup": "Очистка",
+        "No unused files found": "Неиспользуемых файлов не найдено",
+        "Delete {files} unused files and folders ({mb:.1f} MB)?\n\n{details}": "Удалить неиспользуемые файлы и папки: {files} ({mb:.1f} МБ)?\n\n{details}",
+        "Deleted {files} files and folders, freed {mb:.1f} MB in {seconds:.1f} s": "Удалено файлов и папок: {files}, освобождено {mb:.1f} МБ за {seconds:.1f} с",
+        "Libraries": "Библиотеки",
+        "Assets": "Ассеты",
+        "Natives of removed versions": "Нативы удалённых версий",
+        "Java runtimes": "Рантаймы Java",
+        "Mod store": "Хранилище модов",
+        "Checked {files} files ({mb:.1f} MB) in {seconds:.1f} s\n{files_per_second:.0f} files/s, {mb_per_second:.1f} MB/s\nCorrupt: {corrupt}, missing: {missing}, re-downloaded: {repaired}": "Проверено файлов: {files} ({mb:.1f} МБ) за {seconds:.1f} с\n{files_per_second:.0f} файлов/с, {mb_per_second:.1f} МБ/с\nПовреждено: {corrupt}, отсутствует: {missing}, перекачано: {repaired}",
         "Username": "Имя пользователя",
         "No versions available": "Версии недоступны",
+        "Search version...": "Поиск версии...",
+        "Release": "Релизы",
+        "Snapshot": "Снапшоты",
+        "Old beta": "Старые бета",
+        "Installed": "Установленные",
+        "Modded": "С модами",
 
         # --- ModsPage ---
         "Mods from Modrinth": "Моды из Modrinth",
@@ -130,14 +183,55 @@ translations = {
         "minecraft-launcher-lib (default)": "minecraft-launcher-lib (default)",
         "Java (specify path)": "Java (specify path)",
         "Java path (if Java is selected):": "Java path (if Java is selected):",
+        "Java path (empty = detect automatically):": "Java path (empty = detect automatically):",
         "Browse Java path": "Browse Java path",
+        "Download speed limit (KB/s, 0 = unlimited):": "Download speed limit (KB/s, 0 = unlimited):",
+        "JVM profile for:": "JVM profile for:",
+        "Start the game before sounds and other assets finish downloading": "Start the game before sounds and other assets finish downloading",
+        "Download new releases and version updates in the background": "Download new releases and version updates in the background",
+        "Background download speed limit (KB/s, 0 = unlimited):": "Background download speed limit (KB/s, 0 = unlimited):",
+        "All versions": "All versions",
+        "Memory (MB, 0 = auto):": "Memory (MB, 0 = auto):",
+        "Garbage collector:": "Garbage collector:",
+        "JVM default": "JVM default",
+        "Extra JVM arguments:": "Extra JVM arguments:",
+        "Startup: {cds} with CDS, {plain} without": "Startup: {cds} with CDS, {plain} without",
+        "Game starting...": "Game starting...",
+        "Game running ({seconds:.1f} s to start)": "Game running ({seconds:.1f} s to start)",
+        "Game crashed (exit code {code})": "Game crashed (exit code {code})",
+        "Game exited": "Game exited",
+        "New instance": "New instance",
+        "Delete instance": "Delete instance",
+        "Default (.minecraft)": "Default (.minecraft)",
+        "Instance name:": "Instance name:",
+        "Delete instance {name} with its worlds and mods?": "Delete instance {name} with its worlds and mods?",
         "Page backgrounds:": "Page backgrounds:",
         "Save settings": "Save settings",
 
         # --- MinecraftPage ---
         "Play": "Play",
+        "Repair version": "Repair version",
+        "Repair all versions": "Repair all versions",
+        "Repair finished": "Repair finished",
+        "Clean up unused files": "Clean up unused files",
+        "Cleanup": "Cleanup",
+        "No unused files found": "No unused files found",
+        "Delete {files} unused files and folders ({mb:.1f} MB)?\n\n{details}": "Delete {files} unused files and folders ({mb:.1f} MB)?\n\n{details}",
+        "Deleted {files} files and folders, freed {mb:.1f} MB in {seconds:.1f} s": "Deleted {files} files and folders, freed {mb:.1f} MB in {seconds:.1f} s",
+        "Libraries": "Libraries",
+        "Assets": "Assets",
+        "Natives of removed versions": "Natives of removed versions",
+        "Java runtimes": "Java runtimes",
+        "Mod store": "Mod store",
+        "Checked {files} files ({mb:.1f} MB) in {seconds:.1f} s\n{files_per_second:.0f} files/s, {mb_per_second:.1f} MB/s\nCorrupt: {corrupt}, missing: {missing}, re-downloaded: {repaired}": "Checked {files} files ({mb:.1f} MB) in {seconds:.1f} s\n{files_per_second:.0f} files/s, {mb_per_second:.1f} MB/s\nCorrupt: {corrupt}, missing: {missing}, re-downloaded: {repaired}",
         "Username": "Username",
         "No versions available": "No versions available",
+        "Search version...": "Search version...",
+        "Release": "Release",
+        "Snapshot": "Snapshot",
+        "Old beta": "Old beta",
+        "Installed": "Installed",
+        "Modded": "Modded",
 
         # --- ModsPage ---
         "Mods from Modrinth": "Mods from Modrinth",
@@ -218,58 +312,10 @@ translations = {
 }
 
 
-def load_config():
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    # Если файла нет или ошибка, возвращаем значения по умолчанию
-    return {
-        "java_path": "",
-        "ram": 4096,
-        "language": "ru",
-        "theme": "dark",
-        "launch_mode": "launcher_lib"
-    }
-
-
-def save_config(config):
-    try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(config, f, ensure_ascii=False, indent=4)
-    except Exception as e:
-        print("Ошибка сохранения настроек:", e)
-
-
 MODRINTH_API = "https://api.modrinth.com/v2"
 
-# Путь к папке Minecraft
+# Путь к папке Minecraft (только вычисляется, папка создаётся при запуске)
 minecraft_directory = get_minecraft_directory()
-print("Path to Minecraft:", minecraft_directory)
-
-if not os.path.exists(minecraft_directory):
-    print("Minecraft folder not found! Creating...")
-    os.makedirs(minecraft_directory, exist_ok=True)
-
-print("Contents of the Minecraft folder:", os.listdir(minecraft_directory))
-
-profile_path = os.path.join(minecraft_directory, 'launcher_profiles.json')
-print("Path to launcher_profiles.json:", profile_path)
-
-if not os.path.isfile(profile_path):
-    print("launcher_profiles.json not found, creating new...")
-    empty_profile = {
-        "profiles": {},
-        "settings": {},
-        "selectedProfile": None
-    }
-    with open(profile_path, 'w', encoding='utf-8') as f:
-        json.dump(empty_profile, f, indent=4)
-    print("Empty launcher_profiles.json created")
-else:
-    print("launcher_profiles.json already exists")
 
 
 class AnimatedButton(QPushButton):
@@ -434,7 +480,7 @@ class ModernSidebar(QWidget):
         return btn
 
     def on_nav_clicked(self, index):
-        self.main_window.pages.setCurrentIndex(index)
+        self.main_window.show_page(index)
         for i, btn in enumerate(self.nav_buttons):
             btn.setChecked(i == index)
 
@@ -497,97 +543,444 @@ class GradientLabel(QLabel):
         painter.end()
 
 
-class LaunchThread(QThread):
-    launch_setup_signal = pyqtSignal(str, str)
-    progress_update_signal = pyqtSignal(int, int, str)
-    state_update_signal = pyqtSignal(bool)
+class ProgressBus(QObject):
+    # Забирает снимки ProgressAggregator по таймеру (~30 раз в секунду) и
+    # отдаёт их в UI одним сигналом вместо сигнала на каждый кусок файла
+    updated = pyqtSignal(object)
 
-    def __init__(self):
-        super().__init__()
-        self.launch_setup_signal.connect(self.launch_setup)
-        self.version_id = ''
-        self.username = ''
-        self.loader_type = 'vanilla'  # по умолчанию ванилла
-        self.progress = 0
-        self.progress_max = 100
-        self.progress_label = ''
+    def __init__(self, aggregator, parent=None):
+        super().__init__(parent)
+        self.aggregator = aggregator
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(1000 * aggregator.min_interval))
+        self.timer.timeout.connect(self.publish)
+
+    def start(self):
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        self.publish(force=True)
+
+    def publish(self, force=False):
+        snapshot = self.aggregator.poll(force)
+        if snapshot is not None:
+            self.updated.emit(snapshot)
 
-    def launch_setup(self, version_id, username):
-        self.username = username
-        # Убираем проверку forge и fabric
-        self.loader_type = "vanilla"
-        self.version_id = version_id
 
-    def update_progress_label(self, value):
-        self.progress_label = value
-        self.progress_update_signal.emit(self.progress, self.progress_max, self.progress_label)
+def format_progress_label(snapshot):
+    label = snapshot.label
+    if snapshot.bytes_total:
+        mb = 1024 * 1024
+        label += f" — {snapshot.bytes_done / mb:.1f}/{snapshot.bytes_total / mb:.1f} MB"
+        if snapshot.rate:
+            label += f", {snapshot.rate / mb:.1f} MB/s"
+        if snapshot.eta is not None:
+            label += f", ETA {int(snapshot.eta)} s"
+    return label
 
-    def update_progress(self, value):
-        self.progress = value
-        self.progress_update_signal.emit(self.progress, self.progress_max, self.progress_label)
 
-    def update_progress_max(self, value):
-        self.progress_max = value
-        self.progress_update_signal.emit(self.progress, self.progress_max, self.progress_label)
+def apply_progress(progress_bar, progress_label, snapshot):
+    if snapshot.maximum:
+        progress_bar.setMaximum(snapshot.maximum)
+        progress_bar.setValue(min(snapshot.value, snapshot.maximum))
+    elif snapshot.bytes_total:
+        progress_bar.setMaximum(1000)
+        progress_bar.setValue(int(snapshot.bytes_done * 1000 / snapshot.bytes_total))
+    progress_label.setText(format_progress_label(snapshot))
+
+
+class LaunchThread(QThread):
+    # Установка и старт одного клиента; на каждый запуск — свой поток
+    game_started_signal = pyqtSignal(object)
+    launch_failed_signal = pyqtSignal(str)
+
+    def __init__(self, version_id, username, instance="", parent=None):
+        super().__init__(parent)
+        self.version_id = version_id
+        self.username = username
+        self.instance = instance  # "" — общая папка .minecraft
+        self.loader_type = 'vanilla'  # по умолчанию ванилла
+        # Прогресс копится здесь, а в UI его забирает ProgressBus
+        self.progress = ProgressAggregator()
 
     def run(self):
-        self.state_update_signal.emit(True)
+        # Фоновая подкачка версий не делит канал с запуском
+        prefetcher = get_prefetcher(minecraft_directory)
+        prefetcher.hold()
         try:
+            config = load_config()
+            instances = get_instance_manager(minecraft_directory)
+            game_directory = instances.game_directory(self.instance)
+            # Прогрессивная установка: игра стартует, как только есть всё
+            # нужное для запуска, звуки и прочие ассеты докачиваются в фоне
+            languages = None
+            if config.get("progressive_install", True):
+                languages = {"en_us", read_game_language(game_directory)}
             if self.loader_type == "vanilla":
-                install_minecraft_version(
-                    versionid=self.version_id,
+                install_version(
+                    version_id=self.version_id,
                     minecraft_directory=minecraft_directory,
-                    callback={
-                        'setStatus': self.update_progress_label,
-                        'setProgress': self.update_progress,
-                        'setMax': self.update_progress_max
-                    }
+                    callback=self.progress.callback(),
+                    concurrency=config.get("download_threads", 16),
+                    languages=languages
                 )
             else:
                 raise Exception("Неизвестный тип загрузчика")
 
             if self.username == '':
-                self.username = generate_username()[0]
+                self.username = generate_offline_username()
+
+            # В режиме "java" берём указанную в настройках java или подходящую
+            # из найденных; иначе — рантайм Mojang из javaVersion версии
+            java_major = get_version_java_major(minecraft_directory, self.version_id)
+            executable = None
+            if config.get("launch_mode") == "java":
+                executable = get_java_manager(minecraft_directory).resolve(java_major, config.get("java_path"))
+
+            instances.set_version(self.instance, self.version_id)
 
             options = {
                 'username': self.username,
                 'uuid': str(uuid1()),
-                'token': ''
+                'token': '',
+                'gameDirectory': game_directory,
+                'executablePath': executable,
+                'jvmArguments': get_jvm_arguments(minecraft_directory, self.version_id, config)
             }
-            cmd = get_minecraft_command(
-                version=self.version_id,
+            cmd = get_launch_command(
+                version_id=self.version_id,
                 minecraft_directory=minecraft_directory,
                 options=options
             )
-            print("Запускаем команду:", cmd)
-            proc = subprocess.Popen(cmd, cwd=minecraft_directory)
-            proc.wait()
-            print(f"Процесс Minecraft завершился с кодом: {proc.returncode}")
+            # AppCDS: первый запуск пишет архив классов, следующие его подключают
+            cds = get_cds_manager(minecraft_directory).prepare(
+                self.version_id, cmd, java_major, enabled=config.get("cds", True)
+            )
+            print("Запускаем команду:", cds.command)
+            # Процесс дальше ведёт ProcessSupervisor, поток запуска сразу освобождается
+            try:
+                name = f"{self.instance}: {self.version_id}" if self.instance else self.version_id
+                process = get_process_supervisor().spawn(
+                    cds.command, game_directory, f"{name} ({self.username})",
+                    on_line=cds.feed, on_exit=cds.finish
+                )
+            except Exception:
+                cds.cancel()
+                raise
+            print("Minecraft запущен, PID:", process.pid)
+            self.game_started_signal.emit(process)
         except Exception as e:
             print("Ошибка при запуске Minecraft:", e)
+            self.launch_failed_signal.emit(str(e))
+        finally:
+            prefetcher.release()
+
+
+class LaunchJob(QObject):
+    # Запуск в планировщике: свой LaunchThread, свой прогресс и строка
+    # прогресса на странице игры
+    finished = pyqtSignal(object)
+    game_started = pyqtSignal(object)
+
+    def __init__(self, version_id, username, instance="", parent=None):
+        super().__init__(parent)
+        self.version_id = version_id
+        self.username = username
+        self.process = None
+        self.thread = LaunchThread(version_id, username, instance, self)
+        self.progress_bus = ProgressBus(self.thread.progress, self)
+
+        self.widget = QWidget()
+        widget_layout = QVBoxLayout(self.widget)
+        widget_layout.setContentsMargins(0, 0, 0, 0)
+        self.label = QLabel(f"{version_id} ({username or '?'})")
+        self.progress_bar = QProgressBar()
+        widget_layout.addWidget(self.label)
+        widget_layout.addWidget(self.progress_bar)
+
+        self.progress_bus.updated.connect(self.on_progress)
+        self.thread.game_started_signal.connect(self.on_game_started)
+        self.thread.launch_failed_signal.connect(self.on_failed)
+        self.thread.finished.connect(self.on_thread_finished)
+
+    @property
+    def installing(self):
+        return self.thread.isRunning()
+
+    def start(self):
+        self.progress_bus.start()
+        self.thread.start()
+
+    def on_progress(self, snapshot):
+        apply_progress(self.progress_bar, self.label, snapshot)
+        self.label.setText(f"{self.version_id}: {self.label.text()}")
+
+    def on_game_started(self, process):
+        self.process = process
+        self.game_started.emit(process)
+
+    def on_failed(self, message):
+        QMessageBox.warning(self.widget, "SuperLauncher", f"{self.version_id}: {message}")
+
+    def on_thread_finished(self):
+        self.progress_bus.stop()
+        self.widget.deleteLater()
+        self.finished.emit(self)
+
+
+class LaunchScheduler(QObject):
+    # Очередь запусков: одновременно устанавливается и работает не больше
+    # max_instances клиентов, остальные ждут освобождения места
+    job_added = pyqtSignal(object)
+    game_started = pyqtSignal(object)
+
+    def __init__(self, max_instances=4, parent=None):
+        super().__init__(parent)
+        self.max_instances = max_instances
+        self.jobs = []
+        self.queue = []
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.pump)
+
+    def active_count(self):
+        return len(self.jobs) + len(get_process_supervisor().running())
+
+    def submit(self, version_id, username, instance=""):
+        job = LaunchJob(version_id, username, instance, self)
+        job.finished.connect(self.on_job_finished)
+        job.game_started.connect(self.game_started)
+        self.queue.append(job)
+        self.job_added.emit(job)
+        self.pump()
+        return job
+
+    def pump(self):
+        while self.queue and self.active_count() < self.max_instances:
+            job = self.queue.pop(0)
+            self.jobs.append(job)
+            job.start()
+        # Пока есть ожидающие, проверяем, не закрылась ли какая-нибудь игра
+        if self.queue:
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def on_job_finished(self, job):
+        self.jobs.remove(job)
+        job.deleteLater()
+        self.pump()
+
+
+class RepairThread(QThread):
+    repair_finished = pyqtSignal(object)
+    repair_failed = pyqtSignal(str)
+
+    def __init__(self, version_ids=None, parent=None):
+        super().__init__(parent)
+        self.version_ids = version_ids  # None — все установленные версии
+        self.progress = ProgressAggregator()
+
+    def run(self):
+        try:
+            report = repair_versions(
+                minecraft_directory,
+                self.version_ids,
+                callback=self.progress.callback(),
+                concurrency=load_config().get("download_threads", 16)
+            )
+            self.repair_finished.emit(report)
+        except Exception as e:
+            self.repair_failed.emit(str(e))
+
+
+class CleanupThread(QThread):
+    cleanup_finished = pyqtSignal(object)
+    cleanup_failed = pyqtSignal(str)
+
+    def __init__(self, dry_run, parent=None):
+        super().__init__(parent)
+        self.dry_run = dry_run
+
+    def run(self):
+        # Пока идёт очистка, фоновая подкачка не пишет в общие папки
+        prefetcher = get_prefetcher(minecraft_directory)
+        prefetcher.hold()
+        try:
+            report = collect_garbage(minecraft_directory, dry_run=self.dry_run,
+                                     keep_paths=[load_config().get("java_path", "")])
+            self.cleanup_finished.emit(report)
+        except Exception as e:
+            self.cleanup_failed.emit(str(e))
         finally:
-            self.state_update_signal.emit(False)
+            prefetcher.release()
+
+
+class VersionListModel(QAbstractListModel):
+    # Модель для выпадающего списка версий. Фильтр применяется к обычному
+    # списку словарей, а строки отдаются виду порциями через fetchMore,
+    # поэтому открытие списка не зависит от числа версий
+    BATCH_SIZE = 100
+    KINDS = ("release", "snapshot", "old_beta", "modded")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries = []
+        self._filtered = []
+        self._loaded = 0
+        self.kinds = {"release", "modded"}
+        self.installed_only = False
+        self.search = ""
+
+    @staticmethod
+    def entry_kind(entry):
+        if entry.get("loader", "vanilla") != "vanilla":
+            return "modded"
+        kind = entry.get("type", "release")
+        if kind == "old_alpha":
+            return "old_beta"
+        return kind if kind in ("snapshot", "old_beta") else "release"
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._filtered)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self.BATCH_SIZE, len(self._filtered) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= min(self._loaded, len(self._filtered)):
+            return None
+        entry = self._filtered[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return entry["id"]
+        if role == Qt.ItemDataRole.UserRole:
+            return entry
+        return None
+
+    def set_entries(self, entries):
+        if [e["id"] for e in entries] == [e["id"] for e in self._entries]:
+            filtered = self._apply_filter(entries)
+            if [e["id"] for e in filtered] == [e["id"] for e in self._filtered]:
+                # Строки те же — обновляем только данные, без пересоздания модели
+                self._entries = entries
+                self._filtered = filtered
+                if self._loaded:
+                    self.dataChanged.emit(self.index(0), self.index(self._loaded - 1))
+                return
+        # Отфильтрованный список изменился (например, версию удалили при
+        # фильтре "Установленные") — _loaded нужно пересчитать
+        self._entries = entries
+        self._refilter()
+
+    def set_filter(self, kinds=None, installed_only=None, search=None):
+        if kinds is not None:
+            self.kinds = set(kinds)
+        if installed_only is not None:
+            self.installed_only = installed_only
+        if search is not None:
+            self.search = search.strip().lower()
+        self._refilter()
+
+    def _apply_filter(self, entries=None):
+        return [
+            e for e in (self._entries if entries is None else entries)
+            if self.entry_kind(e) in self.kinds
+            and (not self.installed_only or e.get("installed"))
+            and (not self.search or self.search in e["id"].lower())
+        ]
+
+    def _refilter(self):
+        self.beginResetModel()
+        self._filtered = self._apply_filter()
+        self._loaded = min(self.BATCH_SIZE, len(self._filtered))
+        self.endResetModel()
+
+    def row_of(self, version_id):
+        # Догружаем строки до нужной версии, если она ещё не выдана виду
+        for row, entry in enumerate(self._filtered):
+            if entry["id"] == version_id:
+                while self._loaded <= row:
+                    self.fetchMore()
+                return row
+        return -1
+
+
+class GameLogModel(QAbstractListModel):
+    # Лог запущенной игры для QListView: строки забираются из кольцевого
+    # буфера процесса по таймеру, вытесненные из буфера удаляются и из модели,
+    # так что память ограничена, а вид рисует только видимые строки
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.process = None
+        self._lines = []
+        self._first = 0  # сквозной номер первой строки в _lines
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._lines)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self._lines[index.row()]
+        return None
+
+    def set_process(self, process):
+        self.beginResetModel()
+        self.process = process
+        self._lines = []
+        self._first = process.log.first if process is not None else 0
+        self.endResetModel()
+        self.poll()
+
+    def poll(self):
+        # True, если добавились строки
+        if self.process is None:
+            return False
+        first, lines = self.process.log.lines_since(self._first + len(self._lines))
+        dropped = min(len(self._lines), first - self._first)
+        if dropped > 0:
+            self.beginRemoveRows(QModelIndex(), 0, dropped - 1)
+            del self._lines[:dropped]
+            self._first += dropped
+            self.endRemoveRows()
+        if not self._lines:
+            # Буфер мог уйти дальше, чем мы успели прочитать
+            self._first = max(self._first, first)
+        if not lines:
+            return False
+        self.beginInsertRows(QModelIndex(), len(self._lines), len(self._lines) + len(lines) - 1)
+        self._lines.extend(lines)
+        self.endInsertRows()
+        return True
 
 
-# Функция возвращает все версии без фильтрации (Vanilla + Snapshots + Fabric + Forge)
-def get_all_versions():
-    versions = get_version_list()  # vanilla + snapshots
-    versions_dir = os.path.join(minecraft_directory, 'versions')
-    if os.path.exists(versions_dir):
-        for folder in os.listdir(versions_dir):
-            full_path = os.path.join(versions_dir, folder)
-            if os.path.isdir(full_path):
-                if not any(v['id'] == folder for v in versions):
-                    versions.append({'id': folder})
-    return versions
+class VersionsLoadThread(QThread):
+    loaded = pyqtSignal(list)
+
+    def run(self):
+        self.loaded.emit(MinecraftLauncherPage.get_all_versions())
 
 
 class MinecraftLauncherPage(QWidget):
+    manifest_updated = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent_window = parent  # сохраняем ссылку на родителя
         self.config = load_config()  # читаем текущий язык
 
+        # Фоновое обновление манифеста перестраивает список версий
+        self.manifest_updated.connect(self.update_versions_list)
+        get_manifest_cache(minecraft_directory).add_listener(lambda manifest: self.manifest_updated.emit())
+
         # Логотип
         self.logo = QLabel()
         self.logo.setMaximumSize(QSize(256, 37))
@@ -610,8 +1003,46 @@ class MinecraftLauncherPage(QWidget):
             padding: 5px;
         """)
 
+        # Экземпляры: своя папка игры (моды, миры, настройки) на общих версиях и ассетах
+        self.instance_layout = QHBoxLayout()
+        self.instance_select = QComboBox()
+        self.instance_select.setStyleSheet(self.username.styleSheet())
+        self.new_instance_button = QPushButton(self.tr("New instance"))
+        self.new_instance_button.clicked.connect(self.create_instance)
+        self.delete_instance_button = QPushButton(self.tr("Delete instance"))
+        self.delete_instance_button.clicked.connect(self.delete_instance)
+        self.instance_layout.addWidget(self.instance_select, 1)
+        self.instance_layout.addWidget(self.new_instance_button)
+        self.instance_layout.addWidget(self.delete_instance_button)
+        self.load_instances(self.config.get("instance", ""))
+        self.instance_select.currentIndexChanged.connect(self.on_instance_changed)
+
+        # Поиск и фильтры версий
+        self.version_search = QLineEdit()
+        self.version_search.setPlaceholderText(self.tr("Search version..."))
+        self.version_search.setStyleSheet(self.username.styleSheet())
+        self.version_search.textChanged.connect(self.apply_version_filter)
+
+        self.filters_layout = QHBoxLayout()
+        self.filter_checks = {}
+        for kind, label in (("release", "Release"), ("snapshot", "Snapshot"), ("old_beta", "Old beta"),
+                            ("modded", "Modded"), ("installed", "Installed")):
+            check = QCheckBox(self.tr(label))
+            check.setProperty("label_key", label)
+            check.setChecked(kind in ("release", "modded"))
+            check.toggled.connect(self.apply_version_filter)
+            self.filter_checks[kind] = check
+            self.filters_layout.addWidget(check)
+        self.filters_layout.addStretch()
+
         # Список версий
+        self.versions_model = VersionListModel(self)
         self.version_select = QComboBox()
+        version_view = QListView()
+        version_view.setUniformItemSizes(True)
+        self.version_select.setView(version_view)
+        self.version_select.setModel(self.versions_model)
+        self.version_select.setMaxVisibleItems(20)
         self.version_select.setStyleSheet("""
             background-color: #2f2f2f;
             color: white;
@@ -641,17 +1072,70 @@ class MinecraftLauncherPage(QWidget):
         """)
         self.start_button.setCursor(Qt.CursorShape.PointingHandCursor)
 
+        # Строки прогресса идущих запусков
+        self.launch_jobs_layout = QVBoxLayout()
+
+        # Состояние и лог запущенных игр
+        self.game_select = QComboBox()
+        self.game_select.setVisible(False)
+        self.game_select.currentIndexChanged.connect(self.select_game)
+        self.game_status_label = QLabel('')
+        self.game_status_label.setVisible(False)
+        self.game_log_model = GameLogModel(self)
+        self.game_log_view = QListView()
+        self.game_log_view.setModel(self.game_log_model)
+        self.game_log_view.setUniformItemSizes(True)
+        self.game_log_view.setStyleSheet("""
+            background-color: #1e1e1e;
+            color: #ccc;
+            font-family: monospace;
+            border: 1px solid #444;
+            border-radius: 5px;
+        """)
+        self.game_log_view.setVisible(False)
+        self.game_log_timer = QTimer(self)
+        self.game_log_timer.setInterval(200)
+        self.game_log_timer.timeout.connect(self.poll_game)
+
+        # Замеренное время старта выбранной версии с AppCDS-архивом и без него
+        self.startup_label = QLabel('')
+        self.startup_label.setStyleSheet("color: #aaa;")
+        self.version_select.currentTextChanged.connect(self.update_startup_info)
+
+        # Проверка и восстановление файлов
+        self.repair_layout = QHBoxLayout()
+        self.repair_button = QPushButton(self.tr("Repair version"))
+        self.repair_button.clicked.connect(lambda: self.start_repair([self.version_select.currentText()]))
+        self.repair_all_button = QPushButton(self.tr("Repair all versions"))
+        self.repair_all_button.clicked.connect(lambda: self.start_repair(None))
+        self.repair_layout.addWidget(self.repair_button)
+        self.repair_layout.addWidget(self.repair_all_button)
+        self.repair_thread = None
+        self.cleanup_button = QPushButton(self.tr("Clean up unused files"))
+        self.cleanup_button.clicked.connect(lambda: self.start_cleanup(True))
+        self.repair_layout.addWidget(self.cleanup_button)
+        self.cleanup_thread = None
+
         # Layout
         layout = QVBoxLayout(self)
         layout.setContentsMargins(15, 15, 15, 15)
         layout.addWidget(self.logo, 0, Qt.AlignmentFlag.AlignHCenter)
         layout.addItem(self.titlespacer)
         layout.addWidget(self.username)
+        layout.addLayout(self.instance_layout)
+        layout.addWidget(self.version_search)
+        layout.addLayout(self.filters_layout)
         layout.addWidget(self.version_select)
         layout.addItem(self.progress_spacer)
         layout.addWidget(self.start_progress_label)
         layout.addWidget(self.start_progress)
         layout.addWidget(self.start_button)
+        layout.addWidget(self.startup_label)
+        layout.addLayout(self.repair_layout)
+        layout.addLayout(self.launch_jobs_layout)
+        layout.addWidget(self.game_select)
+        layout.addWidget(self.game_status_label)
+        layout.addWidget(self.game_log_view, 1)
 
     # --- Перевод ---
     def tr(self, key: str) -> str:
@@ -660,40 +1144,258 @@ class MinecraftLauncherPage(QWidget):
 
     def refresh_language(self):
         self.username.setPlaceholderText(self.tr("Username"))
+        self.version_search.setPlaceholderText(self.tr("Search version..."))
+        for check in self.filter_checks.values():
+            check.setText(self.tr(check.property("label_key")))
         self.start_button.setText(self.tr("Play"))
+        self.repair_button.setText(self.tr("Repair version"))
+        self.repair_all_button.setText(self.tr("Repair all versions"))
+        self.cleanup_button.setText(self.tr("Clean up unused files"))
+        self.new_instance_button.setText(self.tr("New instance"))
+        self.delete_instance_button.setText(self.tr("Delete instance"))
+        self.instance_select.setItemText(0, self.tr("Default (.minecraft)"))
+        self.update_startup_info()
+
+    # --- Экземпляры ---
+    def load_instances(self, selected=""):
+        self.instance_select.blockSignals(True)
+        self.instance_select.clear()
+        self.instance_select.addItem(self.tr("Default (.minecraft)"), "")
+        for instance in get_instance_manager(minecraft_directory).list():
+            label = f"{instance.name} ({instance.version_id})" if instance.version_id else instance.name
+            self.instance_select.addItem(label, instance.name)
+        self.instance_select.setCurrentIndex(max(0, self.instance_select.findData(selected)))
+        self.instance_select.blockSignals(False)
+
+    def current_instance(self):
+        return self.instance_select.currentData() or ""
+
+    def on_instance_changed(self):
+        # Выбор запоминается в настройках — по нему страница модов выбирает папку mods
+        update_config({"instance": self.current_instance()})
+        instance = get_instance_manager(minecraft_directory).get(self.current_instance())
+        if instance is not None and instance.version_id:
+            self.restore_version_selection(instance.version_id)
+
+    def create_instance(self):
+        name, ok = QInputDialog.getText(self, self.tr("New instance"), self.tr("Instance name:"))
+        if not ok or not name.strip():
+            return
+        try:
+            instance = get_instance_manager(minecraft_directory).create(name, self.version_select.currentText())
+        except (ValueError, OSError) as e:
+            QMessageBox.warning(self, self.tr("Error"), str(e))
+            return
+        self.load_instances(instance.name)
+        self.on_instance_changed()
+
+    def delete_instance(self):
+        name = self.current_instance()
+        if not name:
+            return
+        confirm = QMessageBox.question(
+            self, self.tr("Delete instance"),
+            self.tr("Delete instance {name} with its worlds and mods?").format(name=name),
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if confirm != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            get_instance_manager(minecraft_directory).delete(name)
+        except OSError as e:
+            QMessageBox.warning(self, self.tr("Error"), str(e))
+        self.load_instances("")
+        self.on_instance_changed()
+
+    # --- Запущенные игры ---
+    def add_launch_job(self, job):
+        self.launch_jobs_layout.addWidget(job.widget)
+
+    def attach_game(self, process):
+        # Список повторяет ProcessSupervisor: старые завершённые игры он уже забыл
+        known = get_process_supervisor().processes()
+        for index in reversed(range(self.game_select.count())):
+            if not any(item is self.game_select.itemData(index) for item in known):
+                self.game_select.removeItem(index)
+        self.game_select.addItem(f"{process.name} — PID {process.pid}", process)
+        self.game_select.setCurrentIndex(self.game_select.count() - 1)
+        self.game_select.setVisible(True)
+        self.game_status_label.setVisible(True)
+        self.game_log_view.setVisible(True)
+
+    def select_game(self, index):
+        self.game_log_model.set_process(self.game_select.itemData(index))
+        self.game_log_timer.start()
+        self.poll_game()
+
+    def poll_game(self):
+        process = self.game_log_model.process
+        if process is None:
+            return
+        scrollbar = self.game_log_view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 2
+        if self.game_log_model.poll() and at_bottom:
+            self.game_log_view.scrollToBottom()
+
+        if process.state == STATE_RUNNING:
+            status = self.tr("Game running ({seconds:.1f} s to start)").format(seconds=process.ready_after)
+        elif process.state == STATE_CRASHED:
+            status = self.tr("Game crashed (exit code {code})").format(code=process.returncode)
+        elif process.state == STATE_EXITED:
+            status = self.tr("Game exited")
+        else:
+            status = self.tr("Game starting...")
+        self.game_status_label.setText(f"{process.name}: {status}")
+        if not process.alive:
+            self.game_log_timer.stop()
+            self.update_startup_info()
+
+    def update_startup_info(self):
+        with_cds, without_cds = get_cds_manager(minecraft_directory).startup_times(
+            self.version_select.currentText()
+        )
+        if with_cds is None and without_cds is None:
+            self.startup_label.setText('')
+            return
+
+        def seconds(value):
+            return f"{value:.1f} s" if value is not None else "—"
+
+        self.startup_label.setText(self.tr("Startup: {cds} with CDS, {plain} without").format(
+            cds=seconds(with_cds), plain=seconds(without_cds)
+        ))
+
+    # --- Проверка файлов ---
+    def start_repair(self, version_ids):
+        if self.repair_thread is not None:
+            return
+        self.set_repair_running(True)
+        self.repair_thread = RepairThread(version_ids, self)
+        self.repair_progress_bus = ProgressBus(self.repair_thread.progress, self)
+        self.repair_progress_bus.updated.connect(self.on_repair_progress)
+        self.repair_progress_bus.start()
+        self.repair_thread.repair_finished.connect(self.on_repair_finished)
+        self.repair_thread.repair_failed.connect(self.on_repair_failed)
+        self.repair_thread.finished.connect(self.repair_thread.deleteLater)
+        self.repair_thread.start()
+
+    def set_repair_running(self, running):
+        self.repair_button.setDisabled(running)
+        self.repair_all_button.setDisabled(running)
+        self.start_progress.setVisible(running)
+        self.start_progress_label.setVisible(running)
+        if not running:
+            self.repair_progress_bus.stop()
+            self.repair_progress_bus.deleteLater()
+            self.repair_thread = None
+
+    def on_repair_progress(self, snapshot):
+        apply_progress(self.start_progress, self.start_progress_label, snapshot)
+
+    def on_repair_finished(self, report):
+        self.set_repair_running(False)
+        QMessageBox.information(self, self.tr("Repair finished"), self.tr(
+            "Checked {files} files ({mb:.1f} MB) in {seconds:.1f} s\n"
+            "{files_per_second:.0f} files/s, {mb_per_second:.1f} MB/s\n"
+            "Corrupt: {corrupt}, missing: {missing}, re-downloaded: {repaired}"
+        ).format(
+            files=report.files, mb=report.bytes / (1024 * 1024), seconds=report.elapsed,
+            files_per_second=report.files_per_second, mb_per_second=report.mb_per_second,
+            corrupt=report.corrupt, missing=report.missing, repaired=report.repaired
+        ))
+
+    def on_repair_failed(self, message):
+        self.set_repair_running(False)
+        QMessageBox.critical(self, self.tr("Error"), message)
+
+    # --- Очистка неиспользуемых файлов ---
+    def start_cleanup(self, dry_run):
+        # Сначала пробный проход с отчётом, удаление — после подтверждения
+        if self.cleanup_thread is not None:
+            return
+        self.cleanup_button.setDisabled(True)
+        self.cleanup_thread = CleanupThread(dry_run, self)
+        self.cleanup_thread.cleanup_finished.connect(self.on_cleanup_finished)
+        self.cleanup_thread.cleanup_failed.connect(self.on_cleanup_failed)
+        self.cleanup_thread.finished.connect(self.cleanup_thread.deleteLater)
+        self.cleanup_thread.start()
+
+    def on_cleanup_finished(self, report):
+        self.cleanup_button.setDisabled(False)
+        self.cleanup_thread = None
+        mb = report.bytes / (1024 * 1024)
+        if not report.dry_run:
+            QMessageBox.information(self, self.tr("Cleanup"), self.tr(
+                "Deleted {files} files and folders, freed {mb:.1f} MB in {seconds:.1f} s"
+            ).format(files=report.files, mb=mb, seconds=report.elapsed))
+            return
+        if not report.files:
+            QMessageBox.information(self, self.tr("Cleanup"), self.tr("No unused files found"))
+            return
+        names = {
+            KIND_LIBRARIES: self.tr("Libraries"),
+            KIND_ASSETS: self.tr("Assets"),
+            KIND_NATIVES: self.tr("Natives of removed versions"),
+            KIND_RUNTIMES: self.tr("Java runtimes"),
+            KIND_STORE: self.tr("Mod store"),
+        }
+        details = "\n".join(
+            f"{names[kind]}: {count} ({size / (1024 * 1024):.1f} MB)"
+            for kind, (count, size) in report.sizes.items() if count
+        )
+        answer = QMessageBox.question(self, self.tr("Cleanup"), self.tr(
+            "Delete {files} unused files and folders ({mb:.1f} MB)?\n\n{details}"
+        ).format(files=report.files, mb=mb, details=details))
+        if answer == QMessageBox.StandardButton.Yes:
+            self.start_cleanup(False)
+
+    def on_cleanup_failed(self, message):
+        self.cleanup_button.setDisabled(False)
+        self.cleanup_thread = None
+        QMessageBox.critical(self, self.tr("Error"), message)
 
     # --- Версии Minecraft ---
     def update_versions_list(self):
-        self.version_select.clear()
-        versions = self.get_all_versions()
-        for version in versions:
-            self.version_select.addItem(version['id'])
+        # Список версий грузится из сети, поэтому в отдельном потоке
+        self.versions_thread = VersionsLoadThread(self)
+        self.versions_thread.loaded.connect(self.on_versions_loaded)
+        self.versions_thread.finished.connect(self.versions_thread.deleteLater)
+        self.versions_thread.start()
+
+    def on_versions_loaded(self, versions):
+        current = self.version_select.currentText()
+        self.versions_model.set_entries(versions)
+        self.restore_version_selection(current)
+
+    def apply_version_filter(self):
+        current = self.version_select.currentText()
+        kinds = [kind for kind, check in self.filter_checks.items() if kind != "installed" and check.isChecked()]
+        self.versions_model.set_filter(
+            kinds=kinds,
+            installed_only=self.filter_checks["installed"].isChecked(),
+            search=self.version_search.text()
+        )
+        self.restore_version_selection(current)
+
+    def restore_version_selection(self, version_id):
+        row = self.versions_model.row_of(version_id) if version_id else -1
+        self.version_select.setCurrentIndex(row if row >= 0 else 0)
 
     @staticmethod
     def get_all_versions():
-        from minecraft_launcher_lib.utils import get_version_list, get_minecraft_directory
-        versions = []
-
-        try:
-            online_versions = get_version_list()
-            versions.extend(online_versions)
-        except Exception as e:
-            print("Онлайн-версии недоступны, используем локальные:", e)
-
-        versions_dir = os.path.join(get_minecraft_directory(), 'versions')
-        if os.path.exists(versions_dir):
-            for folder in os.listdir(versions_dir):
-                full_path = os.path.join(versions_dir, folder)
-                if os.path.isdir(full_path):
-                    if not any(v['id'] == folder for v in versions):
-                        versions.append({'id': folder})
-
+        versions = get_all_versions(minecraft_directory, load_config().get("manifest_ttl"))
         if not versions:
             versions.append({'id': 'No versions available'})
         return versions
 
 
 class SettingsPage(QWidget):
+    # Ключи settings.json, которые принадлежат этой странице
+    SETTINGS_KEYS = (
+        "theme", "language", "launch_mode", "java_path", "page_bg", "download_limit_kbps",
+        "progressive_install", "prefetch", "prefetch_limit_kbps", "ram", "gc", "jvm_args", "jvm_profiles",
+    )
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.config = load_config()
@@ -747,6 +1449,65 @@ class SettingsPage(QWidget):
         self.rb_java.toggled.connect(self.java_path_input.setEnabled)
         self.rb_java.toggled.connect(self.buttons["browse_java"].setEnabled)
 
+        # ===== Ограничение скорости загрузок =====
+        self.labels["download_limit"] = QLabel()
+        layout.addWidget(self.labels["download_limit"])
+        self.download_limit_input = QSpinBox()
+        self.download_limit_input.setRange(0, 1024 * 1024)
+        self.download_limit_input.setSingleStep(256)
+        self.download_limit_input.setValue(int(self.config.get("download_limit_kbps", 0) or 0))
+        layout.addWidget(self.download_limit_input)
+
+        self.progressive_check = QCheckBox()
+        self.progressive_check.setChecked(bool(self.config.get("progressive_install", True)))
+        layout.addWidget(self.progressive_check)
+
+        # ===== Фоновая подкачка версий =====
+        self.prefetch_check = QCheckBox()
+        self.prefetch_check.setChecked(bool(self.config.get("prefetch", False)))
+        layout.addWidget(self.prefetch_check)
+        self.labels["prefetch_limit"] = QLabel()
+        layout.addWidget(self.labels["prefetch_limit"])
+        self.prefetch_limit_input = QSpinBox()
+        self.prefetch_limit_input.setRange(0, 1024 * 1024)
+        self.prefetch_limit_input.setSingleStep(256)
+        self.prefetch_limit_input.setValue(int(self.config.get("prefetch_limit_kbps", 1024) or 0))
+        self.prefetch_limit_input.setEnabled(self.prefetch_check.isChecked())
+        self.prefetch_check.toggled.connect(self.prefetch_limit_input.setEnabled)
+        layout.addWidget(self.prefetch_limit_input)
+
+        # ===== Профили JVM (общий и для отдельных версий) =====
+        self.labels["jvm_profile"] = QLabel()
+        layout.addWidget(self.labels["jvm_profile"])
+        self.jvm_profile_combo = QComboBox()
+        self.jvm_profile_combo.addItem("", None)
+        for version_id in installed_versions(minecraft_directory):
+            self.jvm_profile_combo.addItem(version_id, version_id)
+        layout.addWidget(self.jvm_profile_combo)
+
+        self.labels["ram"] = QLabel()
+        layout.addWidget(self.labels["ram"])
+        self.ram_input = QSpinBox()
+        self.ram_input.setRange(0, 256 * 1024)
+        self.ram_input.setSingleStep(512)
+        layout.addWidget(self.ram_input)
+
+        self.labels["gc"] = QLabel()
+        layout.addWidget(self.labels["gc"])
+        self.gc_combo = QComboBox()
+        for gc in GC_CHOICES:
+            self.gc_combo.addItem(gc.upper(), gc)
+        layout.addWidget(self.gc_combo)
+
+        self.labels["jvm_args"] = QLabel()
+        layout.addWidget(self.labels["jvm_args"])
+        self.jvm_args_input = QLineEdit()
+        layout.addWidget(self.jvm_args_input)
+
+        self.jvm_profile_version = None
+        self.show_jvm_profile()
+        self.jvm_profile_combo.currentIndexChanged.connect(self.switch_jvm_profile)
+
         # ===== Фоны страниц =====
         self.labels["page_bg"] = QLabel()
         layout.addWidget(self.labels["page_bg"])
@@ -788,8 +1549,18 @@ class SettingsPage(QWidget):
         self.labels["launch_mode"].setText(self.tr("Minecraft launch mode:"))
         self.rb_launcher_lib.setText(self.tr("minecraft-launcher-lib (default)"))
         self.rb_java.setText(self.tr("Java (specify path)"))
-        self.labels["java_path"].setText(self.tr("Java path (if Java is selected):"))
+        self.labels["java_path"].setText(self.tr("Java path (empty = detect automatically):"))
         self.buttons["browse_java"].setText(self.tr("Browse Java path"))
+        self.labels["download_limit"].setText(self.tr("Download speed limit (KB/s, 0 = unlimited):"))
+        self.progressive_check.setText(self.tr("Start the game before sounds and other assets finish downloading"))
+        self.prefetch_check.setText(self.tr("Download new releases and version updates in the background"))
+        self.labels["prefetch_limit"].setText(self.tr("Background download speed limit (KB/s, 0 = unlimited):"))
+        self.labels["jvm_profile"].setText(self.tr("JVM profile for:"))
+        self.jvm_profile_combo.setItemText(0, self.tr("All versions"))
+        self.labels["ram"].setText(self.tr("Memory (MB, 0 = auto):"))
+        self.labels["gc"].setText(self.tr("Garbage collector:"))
+        self.gc_combo.setItemText(self.gc_combo.findData(GC_DEFAULT), self.tr("JVM default"))
+        self.labels["jvm_args"].setText(self.tr("Extra JVM arguments:"))
         self.labels["page_bg"].setText(self.tr("Page backgrounds:"))
         self.buttons["save"].setText(self.tr("Save settings"))
 
@@ -812,6 +1583,35 @@ class SettingsPage(QWidget):
                 btn.setStyleSheet("border: 2px solid transparent; border-radius: 8px;")
         self.config["page_bg"] = key
 
+    def show_jvm_profile(self):
+        profile = get_jvm_profile(self.config, self.jvm_profile_version)
+        self.ram_input.setValue(int(profile["ram"] or 0))
+        self.gc_combo.setCurrentIndex(max(0, self.gc_combo.findData(profile["gc"])))
+        self.jvm_args_input.setText(profile["jvm_args"])
+
+    def store_jvm_profile(self):
+        values = {
+            "ram": self.ram_input.value(),
+            "gc": self.gc_combo.currentData(),
+            "jvm_args": self.jvm_args_input.text().strip(),
+        }
+        if self.jvm_profile_version is None:
+            self.config.update(values)
+            return
+        # В профиле версии храним только то, что отличается от общих настроек
+        base = get_jvm_profile(self.config, None)
+        overrides = {key: value for key, value in values.items() if value != base[key]}
+        profiles = self.config.setdefault("jvm_profiles", {})
+        if overrides:
+            profiles[self.jvm_profile_version] = overrides
+        else:
+            profiles.pop(self.jvm_profile_version, None)
+
+    def switch_jvm_profile(self):
+        self.store_jvm_profile()
+        self.jvm_profile_version = self.jvm_profile_combo.currentData()
+        self.show_jvm_profile()
+
     def browse_java(self):
         file, _ = QFileDialog.getOpenFileName(
             self, self.tr("Browse Java path"), "", "Executable Files (*.exe);;All Files (*)"
@@ -825,36 +1625,93 @@ class SettingsPage(QWidget):
         self.config["launch_mode"] = "java" if self.rb_java.isChecked() else "launcher_lib"
         self.config["java_path"] = self.java_path_input.text()
         self.config["page_bg"] = self.config.get("page_bg", "dark")
-        save_config(self.config)
+        self.config["download_limit_kbps"] = self.download_limit_input.value()
+        self.config["progressive_install"] = self.progressive_check.isChecked()
+        self.config["prefetch"] = self.prefetch_check.isChecked()
+        self.config["prefetch_limit_kbps"] = self.prefetch_limit_input.value()
+        self.store_jvm_profile()
+        # Пишем только свои ключи: выбранный экземпляр и прочее меняют другие страницы
+        self.config = update_config({key: self.config[key] for key in self.SETTINGS_KEYS if key in self.config})
+        configure_downloads(self.config)
+        configure_prefetch(minecraft_directory, self.config)
         self.update_texts()
 
 
-class ModDownloadThread(QThread):
+class ManagedDownload(QObject):
+    # Загрузка через общий DownloadManager вместо отдельного QThread на файл.
+    # Прогресс из рабочих потоков менеджера копится в ProgressAggregator,
+    # а в UI уходит через ProgressBus с ограниченной частотой
+    download_done = pyqtSignal(object)
+
+    def __init__(self, url, save_path, sha1=None, size=None, priority=PRIORITY_NORMAL, parent=None):
+        super().__init__(parent)
+        self.url = url
+        self.save_path = save_path
+        self.sha1 = sha1
+        self.size = size
+        self.priority = priority
+
+        self.progress_state = ProgressAggregator()
+        self.progress_bus = ProgressBus(self.progress_state, self)
+        self.progress_bus.updated.connect(self.on_progress)
+        self.download_done.connect(self.on_download_done)
+
+    def start(self):
+        self.progress_bus.start()
+        future = get_download_manager().submit(
+            self.url, self.save_path, self.sha1, self.size,
+            priority=self.priority, progress=self.report_progress
+        )
+        future.add_done_callback(self.download_done.emit)
+
+    def report_progress(self, downloaded, total):
+        self.progress_state.report_bytes(self.save_path, downloaded, total)
+
+    def on_download_done(self, future):
+        self.progress_bus.stop()
+        self.on_done(future)
+
+    def on_progress(self, snapshot):
+        pass
+
+    def on_done(self, future):
+        pass
+
+    @staticmethod
+    def percent(snapshot):
+        if not snapshot.bytes_total:
+            return 0
+        return int(snapshot.bytes_done * 100 / snapshot.bytes_total)
+
+
+class ModDownload(ManagedDownload):
     progress = pyqtSignal(int)
     finished = pyqtSignal(str)
 
-    def __init__(self, url, save_path):
-        super().__init__()
+    def on_progress(self, snapshot):
+        self.progress.emit(self.percent(snapshot))
+
+    def on_done(self, future):
+        error = future.exception()
+        self.finished.emit(f"ERROR: {error}" if error else self.save_path)
+
+
+class ModSearchThread(QThread):
+    results = pyqtSignal(list)
+    error = pyqtSignal(str)
+
+    def __init__(self, url, params=None, parent=None):
+        super().__init__(parent)
         self.url = url
-        self.save_path = save_path
+        self.params = params
 
     def run(self):
         try:
-            with requests.get(self.url, stream=True) as r:
-                r.raise_for_status()
-                total = int(r.headers.get("content-length", 0))
-                downloaded = 0
-
-                with open(self.save_path, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            if total > 0:
-                                self.progress.emit(int(downloaded * 100 / total))
-            self.finished.emit(self.save_path)
+            resp = requests.get(self.url, params=self.params, timeout=15)
+            resp.raise_for_status()
+            self.results.emit(resp.json().get("hits", []))
         except Exception as e:
-            self.finished.emit(f"ERROR: {e}")
+            self.error.emit(str(e))
 
 
 class DiscordRPCThread(threading.Thread):
@@ -868,6 +1725,8 @@ class DiscordRPCThread(threading.Thread):
 
     def run(self):
         try:
+            from pypresence import Presence
+
             self.rpc = Presence(self.client_id)
             try:
                 self.rpc.connect()
@@ -918,9 +1777,6 @@ class ModsPage(QWidget):
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(15, 15, 15, 15)
 
-        self.mods_dir = os.path.join(minecraft_directory, "mods")
-        os.makedirs(self.mods_dir, exist_ok=True)
-
         # Заголовок
         self.title = QLabel()
         self.title.setStyleSheet("font-size: 26px; font-weight: bold; margin-bottom: 10px; color: white;")
@@ -934,7 +1790,9 @@ class ModsPage(QWidget):
         # Список результатов
         self.results_list = QListWidget()
         self.results_list.setIconSize(QSize(64, 64))
+        self.results_list.itemClicked.connect(self.show_mod_dialog)
         self.layout.addWidget(self.results_list)
+        self.search_thread = None
 
         # Кнопки
         buttons_layout = QHBoxLayout()
@@ -956,6 +1814,13 @@ class ModsPage(QWidget):
         lang = self.config.get("language", "ru")
         return translations.get(lang, {}).get(key, key)
 
+    @property
+    def mods_dir(self):
+        # Папка mods выбранного на странице игры экземпляра
+        mods_dir = get_instance_manager(minecraft_directory).mods_directory(load_config().get("instance", ""))
+        os.makedirs(mods_dir, exist_ok=True)
+        return mods_dir
+
     def update_texts(self):
         self.title.setText(f"🧩 {self.tr('Mods from Modrinth')}")
         self.search_input.setPlaceholderText(f"🔍 {self.tr('Search mod...')}")
@@ -963,35 +1828,35 @@ class ModsPage(QWidget):
         self.delete_all_button.setText(f"🗑 {self.tr('Delete all mods')}")
 
     def load_featured_mods(self):
-        try:
-            url = f"{MODRINTH_API}/search?limit=20&index=relevance"
-            resp = requests.get(url)
-            data = resp.json()
-            self.results_list.clear()
-            for hit in data["hits"]:
-                item = QListWidgetItem(f"{hit['title']} — {hit.get('description', '')}")
-                item.setData(Qt.ItemDataRole.UserRole, hit["project_id"])
-                self.results_list.addItem(item)
-            self.results_list.itemClicked.connect(self.show_mod_dialog)
-        except Exception as e:
-            QMessageBox.critical(self, self.tr("Error"), str(e))
+        self.run_search({"limit": 20, "index": "relevance"})
 
     def search_mods(self):
         query = self.search_input.text()
         if not query.strip():
             return
-        try:
-            url = f"{MODRINTH_API}/search?query={query}"
-            resp = requests.get(url)
-            data = resp.json()
-            self.results_list.clear()
-            for hit in data["hits"]:
-                item = QListWidgetItem(f"{hit['title']} — {hit.get('description', '')}")
-                item.setData(Qt.ItemDataRole.UserRole, hit["project_id"])
-                self.results_list.addItem(item)
-            self.results_list.itemClicked.connect(self.show_mod_dialog)
-        except Exception as e:
-            QMessageBox.critical(self, self.tr("Error"), str(e))
+        self.run_search({"query": query})
+
+    # Запрос к Modrinth выполняется в фоне, чтобы не блокировать UI
+    def run_search(self, params):
+        self.search_thread = ModSearchThread(f"{MODRINTH_API}/search", params, self)
+        self.search_thread.results.connect(self.on_search_results)
+        self.search_thread.error.connect(self.on_search_error)
+        self.search_thread.finished.connect(self.search_thread.deleteLater)
+        self.search_thread.start()
+
+    def on_search_results(self, hits):
+        if self.sender() is not self.search_thread:
+            return  # ответ на устаревший запрос
+        self.results_list.clear()
+        for hit in hits:
+            item = QListWidgetItem(f"{hit['title']} — {hit.get('description', '')}")
+            item.setData(Qt.ItemDataRole.UserRole, hit["project_id"])
+            self.results_list.addItem(item)
+
+    def on_search_error(self, message):
+        if self.sender() is not self.search_thread:
+            return
+        QMessageBox.critical(self, self.tr("Error"), message)
 
     def show_mod_dialog(self, item):
         project_id = item.data(Qt.ItemDataRole.UserRole)
@@ -1046,14 +1911,23 @@ class ModsPage(QWidget):
             if file["filename"].endswith(".jar"):
                 url = file["url"]
                 filename = file["filename"]
-                save_path = os.path.join(self.mods_dir, filename)
+                sha1 = file.get("hashes", {}).get("sha1")
+                self.mod_target = os.path.join(self.mods_dir, filename)
+                # Мод с известным sha1 качается в общее хранилище один раз,
+                # а в экземпляр попадает ссылкой
+                store = get_instance_manager(minecraft_directory).store
                 dialog.close()
-                self.start_download(url, save_path)
+                if sha1 and store.has(sha1):
+                    # Мод уже есть в хранилище — качать не нужно, только ссылка
+                    self.link_from_store(sha1)
+                    return
+                save_path = store.path_for(sha1) if sha1 else self.mod_target
+                self.start_download(url, save_path, sha1, file.get("size"))
                 return
         QMessageBox.warning(self, self.tr("File not found"),
                             self.tr("File not found"))
 
-    def start_download(self, url, save_path):
+    def start_download(self, url, save_path, sha1=None, size=None):
         self.progress_dialog = QDialog(self)
         self.progress_dialog.setWindowTitle(self.tr("Downloading mod"))
         self.progress_dialog.setModal(True)
@@ -1065,13 +1939,36 @@ class ModsPage(QWidget):
 
         self.progress_dialog.show()
 
-        self.download_thread = ModDownloadThread(url, save_path)
+        self.download_thread = ModDownload(url, save_path, sha1, size, parent=self)
         self.download_thread.progress.connect(self.progress_bar.setValue)
         self.download_thread.finished.connect(self.on_download_finished)
         self.download_thread.start()
 
     def on_download_finished(self, result):
         self.progress_dialog.hide()
+        self.progress_dialog.deleteLater()
+        self.progress_dialog = None
+        if result.startswith("ERROR:"):
+            self.show_install_result(result)
+        elif result == self.mod_target:
+            # Мод без sha1 скачан прямо в экземпляр — переносим его в хранилище
+            try:
+                get_instance_manager(minecraft_directory).store.adopt(result)
+            except OSError as e:
+                result = f"ERROR: {e}"
+            self.show_install_result(result)
+        else:
+            self.link_from_store(os.path.basename(result))
+
+    def link_from_store(self, sha1):
+        try:
+            get_instance_manager(minecraft_directory).store.link(sha1, self.mod_target)
+        except OSError as e:
+            self.show_install_result(f"ERROR: {e}")
+            return
+        self.show_install_result(self.mod_target)
+
+    def show_install_result(self, result):
         if result.startswith("ERROR:"):
             QMessageBox.critical(self, self.tr("Error"), result)
         else:
@@ -1183,32 +2080,8 @@ class NewsPage(QWidget):
 CURRENT_VERSION = "v1.4.0.5"
 
 
-class UpdateDownloadThread(QThread):
-    progress = pyqtSignal(int)
-    finished = pyqtSignal(str)
-
-    def __init__(self, url, filename):
-        super().__init__()
-        self.url = url
-        self.filename = filename
-
-    def run(self):
-        try:
-            with requests.get(self.url, stream=True) as r:
-                r.raise_for_status()
-                total_length = int(r.headers.get("content-length", 0))
-                downloaded = 0
-                with open(self.filename, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            if total_length > 0:
-                                percent = int(downloaded * 100 / total_length)
-                                self.progress.emit(percent)
-            self.finished.emit(str(self.filename))
-        except Exception as e:
-            self.finished.emit(f"ERROR: {str(e)}")
+class UpdateDownload(ModDownload):
+    pass
 
 
 class UpdatesPage(QWidget):
@@ -1297,7 +2170,7 @@ class UpdatesPage(QWidget):
         layout.addWidget(self.progress_bar)
         self.progress_dialog.show()
 
-        self.download_thread = UpdateDownloadThread(download_url, str(filename))
+        self.download_thread = UpdateDownload(download_url, str(filename), parent=self)
         self.download_thread.progress.connect(self.progress_bar.setValue)
         self.download_thread.finished.connect(lambda result: self.finish_update(result))
         self.download_thread.start()
@@ -1385,44 +2258,43 @@ class CreateServerDialog(QDialog):
         self.accept()
 
 
-class DownloadThread(QThread):
+PLAYIT_MSI_URL = "https://github.com/playit-cloud/playit-agent/releases/download/v0.15.26/playit-windows-x86_64-signed.msi"
+
+
+class PlayitDownload(ManagedDownload):
+    finished = pyqtSignal()
+    error = pyqtSignal(str)
+
+    def on_done(self, future):
+        error = future.exception()
+        if error:
+            self.error.emit(str(error))
+        else:
+            self.finished.emit()
+
+
+class ServerJarDownload(ManagedDownload):
     progress_changed = pyqtSignal(int)  # проценты
     finished = pyqtSignal()
     error = pyqtSignal(str)
 
-    def __init__(self, core, version, save_path):
-        super().__init__()
+    def __init__(self, core, version, save_path, parent=None):
+        # Адрес jar узнаётся через API ядра уже в рабочем потоке менеджера
+        super().__init__(lambda: self.get_jar_url(core, version), save_path, parent=parent)
         self.core = core
         self.version = version
-        self.save_path = save_path
 
-    def run(self):
-        try:
-            url = self.get_jar_url(self.core, self.version)
-            r = requests.get(url, stream=True)
-            r.raise_for_status()
-
-            total_length = r.headers.get('content-length')
-            if total_length is None:
-                with open(self.save_path, 'wb') as f:
-                    f.write(r.content)
-                self.progress_changed.emit(100)
-            else:
-                total_length = int(total_length)
-                downloaded = 0
-                with open(self.save_path, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            percent = int(downloaded * 100 / total_length)
-                            self.progress_changed.emit(percent)
+    def on_progress(self, snapshot):
+        self.progress_changed.emit(self.percent(snapshot))
 
+    def on_done(self, future):
+        error = future.exception()
+        if error:
+            self.error.emit(str(error))
+        else:
+            self.progress_changed.emit(100)
             self.finished.emit()
 
-        except Exception as e:
-            self.error.emit(str(e))
-
     def get_jar_url(self, core, version):
         core = core.lower()
         if core == "paper":
@@ -1440,8 +2312,7 @@ class DownloadThread(QThread):
             return f"https://api.purpurmc.org/v2/purpur/{version}/{build}/download"
 
         elif core == "vanilla":
-            manifest = requests.get("https://launchermeta.mojang.com/mc/game/version_manifest.json").json()
-            version_data = next((v for v in manifest["versions"] if v["id"] == version), None)
+            version_data = get_manifest_cache(minecraft_directory).find_version(version)
             if not version_data:
                 raise Exception(f"Версия {version} не найдена")
             version_json = requests.get(version_data["url"]).json()
@@ -1458,6 +2329,7 @@ class ServerControlDialog(QDialog):
         self.server_path = server_path
         self.process = None
         self.playit_process = None
+        self.playit_download = None
 
         self.setWindowTitle(self.tr("Manage server") + f" '{server_name}'")
         self.setFixedSize(350, 300)
@@ -1569,27 +2441,36 @@ class ServerControlDialog(QDialog):
         self.btn_start.setEnabled(not running)
         self.btn_stop.setEnabled(running)
 
-    def download_and_install_playit(self):
-        import requests, tempfile
-
-        msi_url = "https://github.com/playit-cloud/playit-agent/releases/download/v0.15.26/playit-windows-x86_64-signed.msi"
-        temp_dir = tempfile.gettempdir()
-        msi_path = os.path.join(temp_dir, "playit-agent.msi")
-
-        if not os.path.isfile(msi_path):
-            try:
-                response = requests.get(msi_url, stream=True)
-                response.raise_for_status()
-                with open(msi_path, "wb") as f:
-                    for chunk in response.iter_content(8192):
-                        if chunk:
-                            f.write(chunk)
-                os.system(f'powershell -Command "Unblock-File -Path \'{msi_path}\'"')
-            except Exception as e:
-                QMessageBox.critical(self, self.tr("Download error"),
-                                     self.tr("Failed to download playit MSI") + f":\n{e}")
-                return False
-
+    @staticmethod
+    def playit_msi_path():
+        import tempfile
+        return os.path.join(tempfile.gettempdir(), "playit-agent.msi")
+
+    def download_playit(self):
+        # MSI качается через общую очередь, окно не ждёт: установка и запуск
+        # туннеля продолжаются в on_playit_downloaded
+        self.playit_download = PlayitDownload(PLAYIT_MSI_URL, self.playit_msi_path(), parent=self)
+        self.playit_download.finished.connect(self.on_playit_downloaded)
+        self.playit_download.error.connect(self.on_playit_download_error)
+        self.playit_download.start()
+
+    def on_playit_downloaded(self):
+        self.playit_download = None
+        msi_path = self.playit_msi_path()
+        os.system(f'powershell -Command "Unblock-File -Path \'{msi_path}\'"')
+        if self.process is None or self.process.poll() is not None:
+            # Сервер уже остановлен — только ставим агент
+            self.install_playit(msi_path)
+        elif not self.install_and_run_playit(msi_path):
+            QMessageBox.warning(self, "playit.gg", self.tr("Playit tunnel will not be started."))
+
+    def on_playit_download_error(self, error_message):
+        self.playit_download = None
+        QMessageBox.critical(self, self.tr("Download error"),
+                             self.tr("Failed to download playit MSI") + f":\n{error_message}")
+        QMessageBox.warning(self, "playit.gg", self.tr("Playit tunnel will not be started."))
+
+    def install_playit(self, msi_path):
         try:
             result = subprocess.run(["msiexec", "/i", msi_path, "/quiet", "/qn"], capture_output=True, text=True,
                                     shell=False)
@@ -1614,18 +2495,36 @@ class ServerControlDialog(QDialog):
             QMessageBox.critical(self, self.tr("Installation error"), self.tr("Failed to install playit") + f":\n{e}")
             return False
 
-    def start_playit(self):
-        import os, subprocess
+    def find_playit(self):
         possible_paths = [
             os.path.expandvars(r"%ProgramFiles%\playit\playit.exe"),
             os.path.expandvars(r"%ProgramFiles(x86)%\playit\playit.exe"),
             os.path.join(self.server_path, "playit.exe"),
         ]
-        playit_exe = next((p for p in possible_paths if os.path.isfile(p)), None)
-        if not playit_exe and not self.download_and_install_playit():
+        return next((p for p in possible_paths if os.path.isfile(p)), None)
+
+    def start_playit(self):
+        # False — туннель не запустится; True — запущен или запустится после загрузки агента
+        playit_exe = self.find_playit()
+        if playit_exe:
+            return self.run_playit(playit_exe)
+        msi_path = self.playit_msi_path()
+        if os.path.isfile(msi_path):
+            return self.install_and_run_playit(msi_path)
+        if self.playit_download is None:
+            self.download_playit()
+        return True
+
+    def install_and_run_playit(self, msi_path):
+        if not self.install_playit(msi_path):
+            return False
+        playit_exe = self.find_playit()
+        if not playit_exe:
             QMessageBox.warning(self, "playit.gg", self.tr("playit.exe not found after installation"))
             return False
+        return self.run_playit(playit_exe)
 
+    def run_playit(self, playit_exe):
         try:
             self.playit_process = subprocess.Popen([playit_exe], cwd=os.path.dirname(playit_exe))
             return True
@@ -1783,7 +2682,7 @@ class ServersPage(QWidget):
             self.progress_bar.setValue(0)
             self.progress_bar.show()
 
-            self.download_thread = DownloadThread(core, version, os.path.join(server_path, "server.jar"))
+            self.download_thread = ServerJarDownload(core, version, os.path.join(server_path, "server.jar"), self)
             self.download_thread.progress_changed.connect(self.progress_bar.setValue)
             self.download_thread.finished.connect(lambda: self.on_download_finished(name, ip, server_path))
             self.download_thread.error.connect(self.on_download_error)
@@ -1949,18 +2848,54 @@ class MainWindow(QMainWindow):
         """)
         main_layout.addWidget(self.pages)
 
-        # Добавляем страницы
+        # Добавляем страницы. Тяжёлые страницы создаются при первом показе,
+        # до этого на их месте стоит пустая заглушка
+        self.minecraft_page = None
+        self.page_factories = {
+            1: ModsPage,
+            2: NewsPage,
+            3: UpdatesPage,
+            4: ServersPage,
+            6: self.create_minecraft_page,
+        }
         self.pages.addWidget(self.create_modern_page("🏠 Добро пожаловать в SuperLauncher!"))
-        self.pages.addWidget(ModsPage())
-        self.pages.addWidget(NewsPage())
-        self.pages.addWidget(UpdatesPage())
-        self.pages.addWidget(ServersPage())
-        self.settings_page = SettingsPage(self)
-        self.pages.addWidget(self.settings_page)
+        for index in range(1, 7):
+            if index == 5:
+                self.settings_page = SettingsPage(self)
+                self.pages.addWidget(self.settings_page)
+            else:
+                self.pages.addWidget(QWidget())
+
+        # Запуски Minecraft: несколько клиентов одновременно
+        self.launch_scheduler = LaunchScheduler(self.settings_page.config.get("max_instances", 4), self)
+        self.launch_scheduler.job_added.connect(self.launch_job_added)
+        self.launch_scheduler.game_started.connect(self.game_started)
+
+        # Discord RPC
+        self.discord_rpc_thread = DiscordRPCThread(self)
+        self.discord_rpc_thread.start()
 
+        # Применяем настройки
+        self.apply_settings()
+
+    def show_page(self, index):
+        self.ensure_page(index)
+        self.pages.setCurrentIndex(index)
+
+    def ensure_page(self, index):
+        factory = self.page_factories.pop(index, None)
+        if factory is None:
+            return self.pages.widget(index)
+        placeholder = self.pages.widget(index)
+        page = factory()
+        self.pages.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.pages.insertWidget(index, page)
+        return page
+
+    def create_minecraft_page(self):
         # Minecraft страница с обновлённой кнопкой
         minecraft_page = MinecraftLauncherPage()
-        self.pages.addWidget(minecraft_page)
 
         # Заменяем обычную кнопку на анимированную
         if hasattr(minecraft_page, 'start_button'):
@@ -1981,17 +2916,8 @@ class MainWindow(QMainWindow):
                     minecraft_page.start_button = new_button
                     break
 
-        # Потоки для запуска Minecraft
-        self.launch_thread = LaunchThread()
-        self.launch_thread.state_update_signal.connect(self.state_update)
-        self.launch_thread.progress_update_signal.connect(self.update_progress)
-
-        # Discord RPC
-        self.discord_rpc_thread = DiscordRPCThread(self)
-        self.discord_rpc_thread.start()
-
-        # Применяем настройки
-        self.apply_settings()
+        self.minecraft_page = minecraft_page
+        return minecraft_page
 
     def create_modern_page(self, text):
         page = QWidget()
@@ -2065,24 +2991,19 @@ class MainWindow(QMainWindow):
 
     def on_button_clicked(self, button):
         idx = self.sidebar.nav_buttons.index(button)
-        self.pages.setCurrentIndex(idx)
+        self.show_page(idx)
         for i, btn in enumerate(self.sidebar.nav_buttons):
             btn.setChecked(i == idx)
 
-    def update_progress(self, value, max_value, label):
-        minecraft_page = self.pages.widget(6)
-        if hasattr(minecraft_page, 'start_progress'):
-            minecraft_page.start_progress.setMaximum(max_value)
-            minecraft_page.start_progress.setValue(value)
-            minecraft_page.start_progress_label.setText(label)
+    def launch_job_added(self, job):
+        minecraft_page = self.minecraft_page
+        if hasattr(minecraft_page, 'add_launch_job'):
+            minecraft_page.add_launch_job(job)
 
-    def state_update(self, running):
-        minecraft_page = self.pages.widget(6)
-        if hasattr(minecraft_page, 'start_button'):
-            minecraft_page.start_button.setDisabled(running)
-        if hasattr(minecraft_page, 'start_progress'):
-            minecraft_page.start_progress.setVisible(running)
-            minecraft_page.start_progress_label.setVisible(running)
+    def game_started(self, process):
+        minecraft_page = self.minecraft_page
+        if hasattr(minecraft_page, 'attach_game'):
+            minecraft_page.attach_game(process)
 
     def apply_settings(self):
         if hasattr(self, "settings_page"):
@@ -2105,18 +3026,14 @@ class MainWindow(QMainWindow):
                 """)
 
     def launch_game(self):
-        minecraft_page = self.pages.widget(6)
-        if hasattr(self, "settings_page"):
-            config = self.settings_page.config
+        minecraft_page = self.minecraft_page
+        if minecraft_page and hasattr(self, "settings_page"):
             version = minecraft_page.version_select.currentText()
             username = minecraft_page.username.text() or "player"
 
-            if config.get("launch_mode") == "java" and config.get("java_path"):
-                java_path = config["java_path"]
-                print(f"Запуск Minecraft через Java: {java_path} с версией {version} и игроком {username}")
-            else:
-                self.launch_thread.launch_setup_signal.emit(version, username)
-                self.launch_thread.start()
+            # Выбор java (режим "java" или рантайм Mojang) делает LaunchThread
+            self.launch_scheduler.max_instances = self.settings_page.config.get("max_instances", 4)
+            self.launch_scheduler.submit(version, username, minecraft_page.current_instance())
 
     def closeEvent(self, event):
         if hasattr(self, "discord_rpc_thread") and self.discord_rpc_thread:
@@ -2144,6 +3061,10 @@ if __name__ == "__main__":
     import sys
     from PyQt6.QtWidgets import QApplication
 
+    prepare_minecraft_directory(minecraft_directory)
+    configure_downloads(load_config())
+    configure_prefetch(minecraft_directory, load_config())
+
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -0,0 +1,3 @@
+# Ядро лаунчера: пути, настройки, версии и установка.
+# Импорт пакета ничего не читает с диска и не тянет тяжёлые зависимости
+# (PyQt6, minecraft_launcher_lib, requests) — они импортируются внутри функций.
@@ -0,0 +1,238 @@
+import array
+import json
+import os
+import re
+import struct
+import sys
+
+from .paths import get_launcher_directory
+
+ASSET_CACHE_DIR_NAME = "asset_indexes"
+READ_CHUNK_SIZE = 1024 * 1024
+
+_CACHE_MAGIC = b"SLAI"
+_CACHE_VERSION = 1
+# magic, версия, флаги, число объектов, mtime_ns и размер исходного json, длина имён
+_HEADER = struct.Struct("<4sHBIqqI")
+_FLAG_VIRTUAL = 1
+_FLAG_MAP_TO_RESOURCES = 2
+
+# "имя": {"hash": "...", "size": N} — в индексах Mojang поля идут в таком порядке,
+# обратный тоже понимаем. Всё остальное уходит в обычный json.load
+_ENTRY_PATTERN = (
+    rb'"((?:[^"\\]|\\.)*)"\s*:\s*\{\s*(?:'
+    rb'"hash"\s*:\s*"([0-9a-fA-F]{40})"\s*,\s*"size"\s*:\s*(\d+)'
+    rb'|"size"\s*:\s*(\d+)\s*,\s*"hash"\s*:\s*"([0-9a-fA-F]{40})"'
+    rb')\s*\}'
+)
+_ENTRY = re.compile(_ENTRY_PATTERN)
+_NEXT_ENTRY = re.compile(rb'\s*,\s*' + _ENTRY_PATTERN)
+# Документ целиком: {флаги, "objects": {записи через запятую}, флаги}
+_FLAG_FIELD = rb'"(?:virtual|map_to_resources)"\s*:\s*(?:true|false)'
+_HEAD = re.compile(rb'\s*\{\s*(?:' + _FLAG_FIELD + rb'\s*,\s*)*"objects"\s*:\s*\{\s*')
+_TAIL = re.compile(rb'\s*\}\s*(?:,\s*' + _FLAG_FIELD + rb'\s*)*\}\s*')
+_FLAG = re.compile(rb'"(virtual|map_to_resources)"\s*:\s*true')
+
+
+class AssetIndex:
+    # Индекс ассетов в компактном виде: sha1 по 20 байт подряд, размеры в
+    # array("Q") и имена одной строкой через "\n". Индекс на 40 тысяч
+    # объектов занимает около 2 МБ вместо десятков МБ словарей json.load.
+
+    __slots__ = ("hashes", "sizes", "names_blob", "virtual", "map_to_resources")
+
+    def __init__(self, hashes, sizes, names_blob, virtual=False, map_to_resources=False):
+        self.hashes = hashes
+        self.sizes = sizes
+        self.names_blob = names_blob
+        self.virtual = virtual
+        self.map_to_resources = map_to_resources
+
+    def __len__(self):
+        return len(self.sizes)
+
+    @property
+    def legacy(self):
+        # Старые версии читают ассеты по именам из virtual/ или resources/
+        return self.virtual or self.map_to_resources
+
+    def digests(self):
+        hashes = self.hashes
+        return (hashes[i:i + 20] for i in range(0, len(hashes), 20))
+
+    def names(self):
+        return self.names_blob.decode("utf-8").split("\n") if self.sizes else []
+
+    def objects(self):
+        # (имя, sha1 hex, размер) — как записи "objects" в json
+        for name, digest, size in zip(self.names(), self.digests(), self.sizes):
+            yield name, digest.hex(), size
+
+    def total_size(self):
+        return sum(self.sizes)
+
+
+class _Builder:
+    def __init__(self):
+        self.hashes = bytearray()
+        self.sizes = array.array("Q")
+        self.names = bytearray()
+        self.flags = 0
+
+    def add(self, name, sha1, size):
+        # sha1 — hex в str или bytes
+        if self.sizes:
+            self.names += b"\n"
+        self.names += name
+        self.hashes += bytes.fromhex(sha1.decode("ascii") if isinstance(sha1, bytes) else sha1)
+        self.sizes.append(size)
+
+    def build(self):
+        return AssetIndex(bytes(self.hashes), self.sizes, bytes(self.names),
+                          bool(self.flags & _FLAG_VIRTUAL), bool(self.flags & _FLAG_MAP_TO_RESOURCES))
+
+
+def _flags(text):
+    flags = 0
+    for match in _FLAG.finditer(text):
+        flags |= _FLAG_VIRTUAL if match.group(1) == b"virtual" else _FLAG_MAP_TO_RESOURCES
+    return flags
+
+
+def _decode_name(raw):
+    if b"\\" in raw:
+        return json.loads(b'"' + raw + b'"').encode("utf-8")
+    return raw
+
+
+def _parse_stream(f):
+    # Потоковый разбор кусками по READ_CHUNK_SIZE: в памяти только текущий
+    # кусок и недоразобранный хвост. Записи должны идти вплотную через запятую
+    # от начала "objects" до закрывающих скобок в конце файла, иначе
+    # (обрезанный файл, не json, другая структура) — None
+    builder = _Builder()
+    buffer = f.read(READ_CHUNK_SIZE)
+    match = _HEAD.match(buffer)
+    if match is None:
+        return None
+    builder.flags |= _flags(match.group(0))
+    pos = match.end()
+    pattern = _ENTRY
+    eof = False
+    while True:
+        match = pattern.match(buffer, pos)
+        if match is not None:
+            name, sha1, size = match.group(1), match.group(2), match.group(3)
+            if sha1 is None:
+                size, sha1 = match.group(4), match.group(5)
+            builder.add(_decode_name(name), sha1, int(size))
+            pos = match.end()
+            pattern = _NEXT_ENTRY
+            continue
+        if eof:
+            break
+        # Запись могла оборваться на границе куска — дочитываем
+        buffer = buffer[pos:]
+        pos = 0
+        chunk = f.read(READ_CHUNK_SIZE)
+        if chunk:
+            buffer += chunk
+            if len(buffer) > 4 * READ_CHUNK_SIZE:
+                return None
+        else:
+            eof = True
+    match = _TAIL.fullmatch(buffer, pos)
+    if match is None:
+        return None
+    builder.flags |= _flags(match.group(0))
+    return builder.build()
+
+
+def _parse_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    builder = _Builder()
+    for name, obj in data.get("objects", {}).items():
+        builder.add(name.encode("utf-8"), obj["hash"], int(obj.get("size", 0)))
+    builder.flags = (_FLAG_VIRTUAL if data.get("virtual") else 0) | (
+        _FLAG_MAP_TO_RESOURCES if data.get("map_to_resources") else 0)
+    return builder.build()
+
+
+def parse_asset_index(path):
+    with open(path, "rb") as f:
+        index = _parse_stream(f)
+    return index if index is not None else _parse_json(path)
+
+
+def _read_cache(cache_path, st):
+    try:
+        with open(cache_path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                return None
+            magic, version, flags, count, mtime_ns, size, names_length = _HEADER.unpack(header)
+            if (magic, version, mtime_ns, size) != (_CACHE_MAGIC, _CACHE_VERSION, st.st_mtime_ns, st.st_size):
+                return None
+            hashes = f.read(count * 20)
+            sizes = array.array("Q")
+            sizes.frombytes(f.read(count * sizes.itemsize))
+            names_blob = f.read(names_length)
+    except (OSError, ValueError):
+        return None
+    if len(hashes) != count * 20 or len(sizes) != count or len(names_blob) != names_length:
+        return None
+    if sys.byteorder == "big":
+        sizes.byteswap()
+    return AssetIndex(hashes, sizes, names_blob,
+                      bool(flags & _FLAG_VIRTUAL), bool(flags & _FLAG_MAP_TO_RESOURCES))
+
+
+def _write_cache(cache_path, st, index):
+    flags = (_FLAG_VIRTUAL if index.virtual else 0) | (_FLAG_MAP_TO_RESOURCES if index.map_to_resources else 0)
+    sizes = array.array("Q", index.sizes)
+    if sys.byteorder == "big":
+        sizes.byteswap()
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, flags, len(index),
+                             st.st_mtime_ns, st.st_size, len(index.names_blob)))
+        f.write(index.hashes)
+        f.write(sizes.tobytes())
+        f.write(index.names_blob)
+    os.replace(tmp_path, cache_path)
+
+
+def asset_index_path(minecraft_directory, index_id):
+    return os.path.join(minecraft_directory, "assets", "indexes", f"{index_id}.json")
+
+
+def asset_index_cache_path(minecraft_directory, index_id):
+    safe_id = "".join(c if c.isalnum() or c in "._-" else "_" for c in index_id)
+    return os.path.join(get_launcher_directory(minecraft_directory), ASSET_CACHE_DIR_NAME, f"{safe_id}.bin")
+
+
+def load_asset_index(minecraft_directory, index_id):
+    # AssetIndex из assets/indexes/<id>.json или None, если индекса нет.
+    # Разобранный индекс кэшируется в .superlauncher/asset_indexes/<id>.bin
+    # и перечитывается, только когда у json меняются mtime или размер
+    path = asset_index_path(minecraft_directory, index_id)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    cache_path = asset_index_cache_path(minecraft_directory, index_id)
+    index = _read_cache(cache_path, st)
+    if index is not None:
+        return index
+    try:
+        index = parse_asset_index(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Не удалось прочитать индекс ассетов {index_id}:", e)
+        return None
+    try:
+        _write_cache(cache_path, st, index)
+    except OSError as e:
+        print("Не удалось сохранить кэш индекса ассетов:", e)
+    return index
@@ -0,0 +1,174 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+from .files import read_json, write_json_atomic
+from .paths import get_launcher_directory
+
+CDS_DIR_NAME = "cds"
+CDS_INDEX_FILE = "index.json"
+# -XX:ArchiveClassesAtExit (динамический архив) появился в JDK 13
+MIN_CDS_JAVA = 13
+# Строки лога, после которых клиент считается запущенным (звук
+# инициализируется после загрузки ресурсов и появления окна)
+STARTUP_MARKERS = ("Sound engine started", "OpenAL initialized")
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def _classpath(command):
+    for flag in ("-cp", "-classpath", "--class-path"):
+        if flag in command:
+            index = command.index(flag)
+            if index + 1 < len(command):
+                return command[index + 1]
+    return ""
+
+
+def archive_key(command):
+    # Архив годится, только пока не поменялись classpath и сама java
+    executable = shutil.which(command[0]) or command[0]
+    try:
+        st = os.stat(executable)
+        java_stamp = f"{os.path.realpath(executable)}:{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        java_stamp = executable
+    digest = hashlib.sha1()
+    digest.update(java_stamp.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(_classpath(command).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class CdsSession:
+    # Один запуск игры: изменённая команда и замер времени старта
+    def __init__(self, manager, version_id, command, mode, key, archive_path):
+        self.manager = manager
+        self.version_id = version_id
+        self.command = command
+        self.mode = mode  # "use", "dump" или None
+        self.key = key
+        self.archive_path = archive_path
+        self.started = time.monotonic()
+        self.startup_time = None
+
+    def feed(self, line):
+        # Вызывается для каждой строки вывода игры
+        if self.startup_time is None and any(marker in line for marker in STARTUP_MARKERS):
+            self.startup_time = time.monotonic() - self.started
+
+    def finish(self, returncode):
+        self.manager.finish(self, returncode)
+
+    def cancel(self):
+        # Игра так и не запустилась
+        self.manager.cancel(self)
+
+
+class CdsManager:
+    # AppCDS-архивы по версиям в .superlauncher/cds. Первый запуск версии
+    # пишет архив через -XX:ArchiveClassesAtExit, следующие подключают его
+    # через -XX:SharedArchiveFile. Ключ архива — хэш classpath и файла java,
+    # при их смене архив пересоздаётся. Для каждой версии хранится
+    # последнее время старта с архивом и без него.
+
+    def __init__(self, minecraft_directory):
+        self.cds_dir = os.path.join(get_launcher_directory(minecraft_directory), CDS_DIR_NAME)
+        self.index_path = os.path.join(self.cds_dir, CDS_INDEX_FILE)
+        self._lock = threading.Lock()
+        self._index = None
+        self._dumping = set()  # версии, чей архив сейчас пишет запущенная JVM
+
+    def _load(self):
+        if self._index is None:
+            self._index = read_json(self.index_path, {})
+        return self._index
+
+    def _save(self):
+        try:
+            write_json_atomic(self.index_path, self._index, indent=2)
+        except OSError as e:
+            print("Не удалось сохранить индекс CDS:", e)
+
+    def _archive_path(self, version_id, key):
+        safe_id = "".join(c if c.isalnum() or c in "._-" else "_" for c in version_id)
+        return os.path.join(self.cds_dir, f"{safe_id}-{key}.jsa")
+
+    def prepare(self, version_id, command, java_major, enabled=True):
+        if not enabled or java_major < MIN_CDS_JAVA:
+            return CdsSession(self, version_id, command, None, None, None)
+        key = archive_key(command)
+        archive_path = self._archive_path(version_id, key)
+        with self._lock:
+            entry = self._load().get(version_id, {})
+            if entry.get("key") != key:
+                self._remove_archive(entry.get("archive"))
+            failed = entry.get("failed_key") == key
+            # Архив пишет только один из одновременно запущенных клиентов версии
+            dumping = version_id in self._dumping
+            if os.path.isfile(archive_path) and not dumping:
+                flag, mode = f"-XX:SharedArchiveFile={archive_path}", "use"
+            elif not failed and not dumping:
+                os.makedirs(self.cds_dir, exist_ok=True)
+                flag, mode = f"-XX:ArchiveClassesAtExit={archive_path}", "dump"
+                self._dumping.add(version_id)
+            else:
+                return CdsSession(self, version_id, command, None, key, None)
+        return CdsSession(self, version_id, command[:1] + [flag] + command[1:], mode, key, archive_path)
+
+    def finish(self, session, returncode):
+        if session.key is None and session.startup_time is None:
+            return
+        with self._lock:
+            entry = self._load().setdefault(session.version_id, {})
+            if session.mode == "dump":
+                self._dumping.discard(session.version_id)
+                if returncode == 0 and os.path.isfile(session.archive_path):
+                    entry.update(key=session.key, archive=session.archive_path)
+                    entry.pop("failed_key", None)
+                else:
+                    # JVM не смогла записать архив — не пробуем снова с тем же classpath
+                    entry["failed_key"] = session.key
+            if session.startup_time is not None:
+                entry["cds_startup" if session.mode == "use" else "startup"] = round(session.startup_time, 2)
+            self._save()
+
+    def cancel(self, session):
+        with self._lock:
+            if session.mode == "dump":
+                self._dumping.discard(session.version_id)
+
+    def _remove_archive(self, path):
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def startup_times(self, version_id):
+        # (время старта с архивом, без архива) в секундах или None
+        with self._lock:
+            entry = self._load().get(version_id, {})
+            return entry.get("cds_startup"), entry.get("startup")
+
+    def invalidate(self, version_id=None):
+        with self._lock:
+            index = self._load()
+            for vid in [v for v in index if version_id is None or v == version_id]:
+                self._remove_archive(index[vid].get("archive"))
+                index[vid].pop("archive", None)
+                index[vid].pop("key", None)
+                index[vid].pop("failed_key", None)
+            self._save()
+
+
+def get_cds_manager(minecraft_directory):
+    with _managers_lock:
+        manager = _managers.get(minecraft_directory)
+        if manager is None:
+            manager = CdsManager(minecraft_directory)
+            _managers[minecraft_directory] = manager
+        return manager
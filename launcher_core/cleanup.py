@@ -0,0 +1,348 @@
+import os
+import shutil
+import time
+
+from .asset_index import ASSET_CACHE_DIR_NAME, asset_index_path, load_asset_index
+from .files import read_json
+from .install import library_path, version_json_path
+from .instances import STORE_DIR_NAME, get_instance_manager
+from .journal import invalidate_install_journals
+from .paths import get_launcher_directory
+from .repair import installed_versions
+from .versions import detect_loader
+
+CLEANUP_GRACE = 3600  # секунд: свежие файлы могут принадлежать идущей установке
+
+KIND_LIBRARIES = "libraries"
+KIND_ASSETS = "assets"
+KIND_NATIVES = "natives"
+KIND_RUNTIMES = "runtimes"
+KIND_STORE = "store"
+CLEANUP_KINDS = (KIND_LIBRARIES, KIND_ASSETS, KIND_NATIVES, KIND_RUNTIMES, KIND_STORE)
+
+# Forge и NeoForge при установке кладут в libraries/ файлы, которых нет в
+# списке библиотек (пропатченный клиент, маппинги) — пока стоит такая
+# версия, эти ветки не трогаем
+LOADER_LIBRARY_PREFIXES = {
+    "forge": ("net/minecraftforge/", "net/minecraft/client/", "net/minecraft/server/", "de/oceanlabs/mcp/"),
+    "neoforge": ("net/neoforged/", "net/minecraft/client/", "net/minecraft/server/"),
+}
+
+
+class CleanupReport:
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.garbage = []  # [(вид, путь, байт)] — файлы и папки целиком
+        self.sizes = {kind: [0, 0] for kind in CLEANUP_KINDS}  # вид -> [штук, байт]
+        self.scanned = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def add(self, kind, path, size):
+        self.garbage.append((kind, path, size))
+        self.sizes[kind][0] += 1
+        self.sizes[kind][1] += size
+
+    @property
+    def files(self):
+        return sum(count for count, _ in self.sizes.values())
+
+    @property
+    def bytes(self):
+        return sum(size for _, size in self.sizes.values())
+
+
+class References:
+    # Всё, на что ссылаются установленные версии (фаза mark)
+    def __init__(self):
+        self.library_dirs = set()  # папки group/artifact/version внутри libraries/
+        self.library_prefixes = ()
+        self.asset_indexes = set()
+        self.asset_hashes = set()  # sha1 объектов по 20 байт
+        self.log_configs = set()
+        self.runtimes = set()
+        self.versions = set()
+
+
+def _norm(path):
+    return os.path.normcase(os.path.normpath(path))
+
+
+def _library_paths(lib):
+    # Все файлы библиотеки под любую ОС и разрядность: правила не применяем,
+    # чтобы не удалить нативы другой платформы у общей папки
+    name = lib.get("name", "")
+    downloads = lib.get("downloads", {})
+    artifact = downloads.get("artifact")
+    if artifact and artifact.get("path"):
+        yield artifact["path"]
+    elif name.count(":") >= 2:
+        yield library_path(name)
+    for classifier, native in downloads.get("classifiers", {}).items():
+        if native.get("path"):
+            yield native["path"]
+        elif name.count(":") >= 2:
+            yield library_path(name, classifier)
+    if name.count(":") >= 2:
+        for classifier in lib.get("natives", {}).values():
+            for bits in ("32", "64"):
+                yield library_path(name, classifier.replace("${arch}", bits))
+
+
+def mark_references(minecraft_directory):
+    refs = References()
+    libraries_dir = os.path.join(minecraft_directory, "libraries")
+    loaders = set()
+    loaded = {}
+    for version_id in installed_versions(minecraft_directory):
+        # Цепочка inheritsFrom: индекс ассетов и рантайм обычно берутся у родителя
+        current = version_id
+        while current and current not in loaded:
+            path = version_json_path(minecraft_directory, current)
+            data = read_json(path)
+            loaded[current] = data
+            if data is None:
+                if os.path.exists(path):
+                    # Не знаем, на что ссылается версия, — без этого sweep удалил бы её файлы
+                    raise Exception(f"Не удалось прочитать {path}, очистка отменена")
+                break
+            refs.versions.add(current)
+            loaders.add(detect_loader(current, data))
+            for lib in data.get("libraries", []):
+                for path in _library_paths(lib):
+                    refs.library_dirs.add(_norm(os.path.dirname(os.path.join(libraries_dir, path))))
+            if data.get("assetIndex", {}).get("id"):
+                refs.asset_indexes.add(data["assetIndex"]["id"])
+            if data.get("assets"):
+                refs.asset_indexes.add(data["assets"])
+            log_file = data.get("logging", {}).get("client", {}).get("file", {})
+            if log_file.get("id"):
+                refs.log_configs.add(log_file["id"])
+            if data.get("javaVersion", {}).get("component"):
+                refs.runtimes.add(data["javaVersion"]["component"])
+            current = data.get("inheritsFrom")
+
+    refs.library_prefixes = tuple(prefix for loader in loaders for prefix in LOADER_LIBRARY_PREFIXES.get(loader, ()))
+    for index_id in refs.asset_indexes:
+        asset_index = load_asset_index(minecraft_directory, index_id)
+        if asset_index is None:
+            path = asset_index_path(minecraft_directory, index_id)
+            if os.path.exists(path):
+                # Без индекса все его объекты выглядели бы мусором
+                raise Exception(f"Не удалось прочитать {path}, очистка отменена")
+            continue
+        refs.asset_hashes.update(asset_index.digests())
+    return refs
+
+
+def _digest(name):
+    try:
+        return bytes.fromhex(name) if len(name) == 40 else None
+    except ValueError:
+        return None
+
+
+def _tree_size(path):
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            pass
+    return total
+
+
+def _tree_mtime(path):
+    latest = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                latest = max(latest, os.lstat(os.path.join(root, name)).st_mtime)
+            except OSError:
+                pass
+    return latest
+
+
+class _Sweeper:
+    # Фаза sweep: собирает всё, что лежит в управляемых папках и не отмечено
+    def __init__(self, minecraft_directory, refs, report, grace, keep_paths):
+        self.minecraft_directory = minecraft_directory
+        self.refs = refs
+        self.report = report
+        self.cutoff = time.time() - grace
+        self.keep_paths = [_norm(path) for path in keep_paths if path]
+
+    def _file(self, kind, entry):
+        self.report.scanned += 1
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            self.report.errors += 1
+            return
+        if st.st_mtime < self.cutoff:
+            self.report.add(kind, entry.path, st.st_size)
+
+    def _directory(self, kind, path):
+        if _tree_mtime(path) < self.cutoff:
+            self.report.add(kind, path, _tree_size(path))
+
+    def _kept(self, path):
+        path = _norm(path)
+        return any(keep == path or keep.startswith(path + os.sep) for keep in self.keep_paths)
+
+    def libraries(self):
+        libraries_dir = os.path.join(self.minecraft_directory, "libraries")
+        for root, dirs, files in os.walk(libraries_dir):
+            if not files or _norm(root) in self.refs.library_dirs:
+                continue
+            relative = os.path.relpath(root, libraries_dir).replace(os.sep, "/") + "/"
+            if relative.startswith(self.refs.library_prefixes):
+                continue
+            with os.scandir(root) as it:
+                for entry in it:
+                    if not entry.is_dir(follow_symlinks=False):
+                        self._file(KIND_LIBRARIES, entry)
+
+    def assets(self):
+        assets_dir = os.path.join(self.minecraft_directory, "assets")
+        hashes = self.refs.asset_hashes
+        objects_dir = os.path.join(assets_dir, "objects")
+        if os.path.isdir(objects_dir):
+            with os.scandir(objects_dir) as buckets:
+                for bucket in buckets:
+                    if not bucket.is_dir(follow_symlinks=False):
+                        continue
+                    with os.scandir(bucket.path) as it:
+                        for entry in it:
+                            if _digest(entry.name) not in hashes:
+                                self._file(KIND_ASSETS, entry)
+                            else:
+                                self.report.scanned += 1
+
+        cache_dir = os.path.join(get_launcher_directory(self.minecraft_directory), ASSET_CACHE_DIR_NAME)
+        for path, keep, suffix in ((os.path.join(assets_dir, "indexes"), self.refs.asset_indexes, ".json"),
+                                   (os.path.join(assets_dir, "log_configs"), self.refs.log_configs, ""),
+                                   (cache_dir, self.refs.asset_indexes, ".bin")):
+            if not os.path.isdir(path):
+                continue
+            with os.scandir(path) as it:
+                for entry in it:
+                    name = entry.name[:-len(suffix)] if suffix and entry.name.endswith(suffix) else entry.name
+                    if entry.is_file(follow_symlinks=False) and name not in keep:
+                        self._file(KIND_ASSETS, entry)
+
+        virtual_dir = os.path.join(assets_dir, "virtual")
+        if os.path.isdir(virtual_dir):
+            with os.scandir(virtual_dir) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False) and entry.name not in self.refs.asset_indexes:
+                        self._directory(KIND_ASSETS, entry.path)
+
+    def natives(self):
+        # Распакованные нативы версий, от которых остались только папки
+        versions_dir = os.path.join(self.minecraft_directory, "versions")
+        if not os.path.isdir(versions_dir):
+            return
+        with os.scandir(versions_dir) as it:
+            for entry in it:
+                if not entry.is_dir() or entry.name in self.refs.versions:
+                    continue
+                natives_dir = os.path.join(entry.path, "natives")
+                if os.path.isdir(natives_dir):
+                    self._directory(KIND_NATIVES, natives_dir)
+
+    def runtimes(self):
+        runtime_dir = os.path.join(self.minecraft_directory, "runtime")
+        if not os.path.isdir(runtime_dir):
+            return
+        with os.scandir(runtime_dir) as it:
+            for entry in it:
+                if (entry.is_dir(follow_symlinks=False) and entry.name not in self.refs.runtimes
+                        and not self._kept(entry.path)):
+                    self._directory(KIND_RUNTIMES, entry.path)
+
+    def store(self):
+        # Файл хранилища нужен, пока на него есть жёсткая ссылка (st_nlink > 1)
+        # или символическая из папки mods какого-нибудь экземпляра
+        store_dir = os.path.join(get_launcher_directory(self.minecraft_directory), STORE_DIR_NAME)
+        if not os.path.isdir(store_dir):
+            return
+        instances = get_instance_manager(self.minecraft_directory)
+        mods_dirs = [instances.mods_directory("")] + [
+            instances.mods_directory(instance.name) for instance in instances.list()
+        ]
+        linked = set()
+        for mods_dir in mods_dirs:
+            try:
+                with os.scandir(mods_dir) as it:
+                    for entry in it:
+                        if entry.is_symlink():
+                            linked.add(_norm(os.path.realpath(entry.path)))
+            except OSError:
+                pass
+
+        for root, dirs, files in os.walk(store_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                self.report.scanned += 1
+                try:
+                    st = os.stat(path)  # st_nlink из scandir в Windows всегда 0
+                except OSError:
+                    self.report.errors += 1
+                    continue
+                if st.st_nlink > 1 or _norm(os.path.realpath(path)) in linked:
+                    continue
+                if st.st_mtime < self.cutoff:
+                    self.report.add(KIND_STORE, path, st.st_size)
+
+
+def _prune_empty_dirs(root):
+    for path, dirs, files in os.walk(root, topdown=False):
+        if path != root and not dirs and not files:
+            try:
+                os.rmdir(path)
+            except OSError:
+                pass
+
+
+def collect_garbage(minecraft_directory, dry_run=True, grace=CLEANUP_GRACE, keep_paths=()):
+    # Mark-and-sweep: отмечаем всё, на что ссылаются json-ы из versions/ (по
+    # цепочке inheritsFrom) и их индексы ассетов, остальное в libraries/,
+    # assets/, runtime/, нативах удалённых версий и хранилище модов — мусор.
+    # dry_run — только отчёт. keep_paths — пути (например, java из настроек),
+    # рантаймы с которыми трогать нельзя
+    started = time.perf_counter()
+    report = CleanupReport(dry_run)
+    refs = mark_references(minecraft_directory)
+    sweeper = _Sweeper(minecraft_directory, refs, report, grace, keep_paths)
+    sweeper.libraries()
+    sweeper.assets()
+    sweeper.natives()
+    sweeper.runtimes()
+    sweeper.store()
+
+    if not dry_run:
+        for kind, path, size in report.garbage:
+            try:
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except OSError as e:
+                print("Не удалось удалить", path, e)
+                report.errors += 1
+        for folder in (os.path.join(minecraft_directory, "libraries"),
+                       os.path.join(minecraft_directory, "assets", "objects"),
+                       os.path.join(get_launcher_directory(minecraft_directory), STORE_DIR_NAME)):
+            _prune_empty_dirs(folder)
+        if report.garbage:
+            # Установки перепроверятся по файлам, а не по журналам
+            invalidate_install_journals(minecraft_directory)
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,61 @@
+import json
+import os
+
+CONFIG_FILE = "settings.json"
+
+DEFAULT_CONFIG = {
+    "java_path": "",
+    "ram": 4096,  # МБ, 0 — подобрать по объёму RAM
+    "gc": "g1",
+    "jvm_args": "",
+    "jvm_profiles": {},  # id версии -> {"ram", "gc", "jvm_args"}
+    "cds": True,  # AppCDS-архивы классов для ускорения запуска
+    "max_instances": 4,  # сколько клиентов можно запускать одновременно
+    "language": "ru",
+    "theme": "dark",
+    "launch_mode": "launcher_lib",
+    "manifest_ttl": 600,
+    "download_threads": 16,
+    "download_limit_kbps": 0,
+    "progressive_install": True,  # звуки и прочие ленивые ассеты докачиваются после старта игры
+    "prefetch": False,  # подкачивать новый релиз и обновления версий, пока лаунчер простаивает
+    "prefetch_limit_kbps": 1024
+}
+
+
+def load_config():
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            pass
+    # Если файла нет или ошибка, возвращаем значения по умолчанию
+    return dict(DEFAULT_CONFIG)
+
+
+def save_config(config):
+    try:
+        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+            json.dump(config, f, ensure_ascii=False, indent=4)
+    except Exception as e:
+        print("Ошибка сохранения настроек:", e)
+
+
+def update_config(changes):
+    # Перечитывает файл и меняет только переданные ключи, чтобы страницы со
+    # своей копией настроек не затирали чужие изменения
+    config = load_config()
+    config.update(changes)
+    save_config(config)
+    return config
+
+
+def configure_downloads(config):
+    # Применяет настройки загрузок к общему DownloadManager
+    from .download_manager import get_download_manager
+
+    get_download_manager().configure(
+        workers=config.get("download_threads", DEFAULT_CONFIG["download_threads"]),
+        bandwidth_limit=int(config.get("download_limit_kbps", 0) or 0) * 1024
+    )
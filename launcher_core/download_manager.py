@@ -0,0 +1,177 @@
+import itertools
+import os
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+
+from .downloader import DEFAULT_CONCURRENCY, DownloadCancelled, download_file
+from .http import get_session
+
+# Чем меньше число, тем раньше задача берётся из очереди
+PRIORITY_LAUNCH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BACKGROUND = 10
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+class RateLimiter:
+    # Общий для всех потоков token bucket; 0 — без ограничения
+    def __init__(self, bytes_per_second=0):
+        self._lock = threading.Lock()
+        self.bytes_per_second = bytes_per_second
+        self._allowance = 0.0
+        self._last = time.monotonic()
+
+    def consume(self, amount):
+        if not self.bytes_per_second:
+            return
+        with self._lock:
+            now = time.monotonic()
+            rate = self.bytes_per_second
+            # Запас не больше секунды трафика, чтобы после простоя не было всплеска
+            self._allowance = min(rate, self._allowance + (now - self._last) * rate) - amount
+            self._last = now
+            delay = -self._allowance / rate if self._allowance < 0 else 0
+        if delay > 0:
+            time.sleep(delay)
+
+
+class DownloadJob:
+    def __init__(self, url, path, sha1, size, priority, throttle=None):
+        self.url = url  # строка или функция, возвращающая адрес (вызывается в рабочем потоке)
+        self.path = path
+        self.sha1 = sha1
+        self.size = size
+        self.priority = priority
+        self.throttle = throttle  # throttle(байт) своего владельца; может бросить DownloadCancelled
+        self.future = Future()
+        self.extra_paths = []
+        self.started = False
+        self._listeners = []
+
+    def add_progress_listener(self, callback):
+        if callback is not None:
+            self._listeners.append(callback)
+
+    def report(self, downloaded, total):
+        for callback in list(self._listeners):
+            callback(downloaded, total)
+
+
+class DownloadManager:
+    # Единая очередь загрузок лаунчера: общий пул потоков и соединений,
+    # приоритеты, общий лимит скорости и склейка одинаковых URL в одну загрузку
+
+    def __init__(self, workers=DEFAULT_CONCURRENCY, bandwidth_limit=0):
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._threads = []
+        self.workers = max(1, int(workers))
+        self.limiter = RateLimiter(bandwidth_limit)
+
+    def configure(self, workers=None, bandwidth_limit=None):
+        if workers:
+            self.workers = max(1, int(workers))
+        if bandwidth_limit is not None:
+            self.limiter.bytes_per_second = max(0, int(bandwidth_limit))
+        with self._lock:
+            surplus = len(self._threads) - self.workers
+            # Лишние потоки выходят, разобрав пустую задачу; занятые — после текущей загрузки
+            for _ in range(max(0, surplus)):
+                self._queue.put((PRIORITY_LAUNCH - 1, next(self._seq), None))
+        self._ensure_workers()
+
+    def _retire_if_surplus(self):
+        with self._lock:
+            current = threading.current_thread()
+            if len(self._threads) > self.workers and current in self._threads:
+                self._threads.remove(current)
+                return True
+        return False
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, url, path, sha1=None, size=None, priority=PRIORITY_NORMAL, progress=None, throttle=None):
+        with self._lock:
+            job = self._inflight.get(url) if isinstance(url, str) else None
+            if job is not None:
+                # Такой URL уже качается — подписываемся на ту же загрузку
+                job.add_progress_listener(progress)
+                if os.path.abspath(path) != os.path.abspath(job.path):
+                    job.extra_paths.append(path)
+                if job.throttle is not throttle:
+                    # Файл нужен ещё кому-то — ограничения фоновой загрузки снимаем
+                    job.throttle = None
+                if priority < job.priority:
+                    job.priority = priority
+                    if not job.started:
+                        self._queue.put((priority, next(self._seq), job))
+                return job.future
+            job = DownloadJob(url, path, sha1, size, priority, throttle)
+            job.add_progress_listener(progress)
+            if isinstance(url, str):
+                self._inflight[url] = job
+            self._queue.put((priority, next(self._seq), job))
+        self._ensure_workers()
+        return job.future
+
+    def _worker(self):
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                if self._retire_if_surplus():
+                    return
+                continue
+            with self._lock:
+                # Задача могла попасть в очередь дважды при повышении приоритета
+                if job.started:
+                    continue
+                job.started = True
+            try:
+                url = job.url() if callable(job.url) else job.url
+                while True:
+                    try:
+                        download_file(url, job.path, job.sha1, job.size, progress=job.report,
+                                      session=get_session(), throttle=lambda n, job=job: self._throttle(job, n))
+                        break
+                    except DownloadCancelled:
+                        # Пока загрузка прерывалась, её забрал запрос без ограничений
+                        if job.throttle is not None:
+                            raise
+                with self._lock:
+                    extra_paths = list(job.extra_paths)
+                    self._inflight.pop(job.url, None)
+                for path in extra_paths:
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                    shutil.copyfile(job.path, path)
+                job.future.set_result(job.path)
+            except Exception as e:
+                with self._lock:
+                    self._inflight.pop(job.url, None)
+                job.future.set_exception(e)
+
+    def _throttle(self, job, amount):
+        throttle = job.throttle
+        if throttle is not None:
+            throttle(amount)
+        self.limiter.consume(amount)
+
+
+def get_download_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = DownloadManager()
+        return _manager
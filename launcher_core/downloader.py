@@ -0,0 +1,337 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .files import read_json, write_json_atomic
+from .http import get_session
+
+DEFAULT_CONCURRENCY = 16
+DOWNLOAD_RETRIES = 3
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+_buffers = threading.local()
+
+
+class DownloadError(Exception):
+    pass
+
+
+class DownloadCancelled(DownloadError):
+    # Загрузку прервали намеренно (например, фоновую — ради запуска игры);
+    # повторять её не нужно, .part остаётся для докачки
+    pass
+
+
+class DownloadTask:
+    __slots__ = ("url", "path", "sha1", "size")
+
+    def __init__(self, url, path, sha1=None, size=None):
+        self.url = url
+        self.path = path
+        self.sha1 = sha1
+        self.size = size
+
+
+def file_sha1(path):
+    return file_sha1_and_size(path)[0]
+
+
+def file_sha1_and_size(path):
+    # (sha1, прочитано байт) — чтение через буфер рабочего потока
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        _hash_stream(f, sha1)
+        return sha1.hexdigest(), f.tell()
+
+
+def _get_buffer():
+    # Один буфер на рабочий поток: память не растёт с размером файла
+    buffer = getattr(_buffers, "buffer", None)
+    if buffer is None:
+        buffer = memoryview(bytearray(MAX_CHUNK_SIZE))
+        _buffers.buffer = buffer
+    return buffer
+
+
+def _hash_stream(f, sha1, limit=None):
+    buffer = _get_buffer()
+    remaining = limit
+    while remaining is None or remaining > 0:
+        view = buffer if remaining is None else buffer[:min(len(buffer), remaining)]
+        n = f.readinto(view)
+        if not n:
+            break
+        sha1.update(view[:n])
+        if remaining is not None:
+            remaining -= n
+
+
+def is_file_valid(task):
+    try:
+        size = os.path.getsize(task.path)
+    except OSError:
+        return False
+    if task.size is not None and size != task.size:
+        return False
+    if task.sha1 is None:
+        return True
+    return file_sha1(task.path) == task.sha1
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _part_validator(headers):
+    # Для If-Range подходит только сильный ETag, иначе Last-Modified
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def _preallocate(f, offset, total):
+    # Резервируем место под весь файл заранее, чтобы он не фрагментировался.
+    # Ошибка здесь не критична — файл просто будет расти по мере записи
+    try:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(f.fileno(), offset, total - offset)
+        elif os.name == "nt":
+            f.truncate(total)
+            f.seek(offset)
+        else:
+            return False
+        return True
+    except OSError:
+        return False
+
+
+def _stream_to_file(raw, f, sha1, offset, total, progress, throttle):
+    # readinto в переиспользуемый буфер; размер куска подстраивается под
+    # скорость соединения: быстрые чтения увеличивают его до MAX_CHUNK_SIZE
+    buffer = _get_buffer()
+    chunk_size = MIN_CHUNK_SIZE
+    downloaded = offset
+    try:
+        while True:
+            started = time.monotonic()
+            n = raw.readinto(buffer[:chunk_size])
+            if not n:
+                break
+            chunk = buffer[:n]
+            f.write(chunk)
+            if sha1 is not None:
+                sha1.update(chunk)
+            downloaded += n
+            if throttle:
+                throttle(n)
+            if progress:
+                progress(downloaded, total)
+            # Ожидание ограничителя скорости тоже учитываем — при лимите куски остаются мелкими
+            elapsed = time.monotonic() - started
+            if n == chunk_size and elapsed < 0.05:
+                chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
+            elif elapsed > 0.5:
+                chunk_size = max(chunk_size // 2, MIN_CHUNK_SIZE)
+    finally:
+        # После предвыделения хвост файла пустой — обрезаем до реально
+        # записанного, чтобы докачка продолжилась с правильного места
+        f.truncate(downloaded)
+    return downloaded
+
+
+def _download_part(url, part_path, meta_path, size, progress, session, timeout, throttle, sha1=None):
+    # Возвращает размер .part-файла. Объект hashlib, если передан, получает
+    # sha1 прямо во время загрузки (вместе с уже скачанным ранее началом).
+    # Поток короче Content-Length — ошибка: не все версии urllib3 это проверяют
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    meta = read_json(meta_path, {})
+    headers = {"Accept-Encoding": "identity"}
+    if offset and meta.get("url") == url and meta.get("validator") and not meta.get("preallocated"):
+        if size is not None and offset == size:
+            if sha1 is not None:
+                with open(part_path, "rb") as f:
+                    _hash_stream(f, sha1)
+            return offset
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = meta["validator"]
+    else:
+        offset = 0
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as r:
+        if r.status_code == 416:
+            # Сервер не принял диапазон — начинаем заново
+            _remove(part_path)
+            _remove(meta_path)
+            raise DownloadError(f"Диапазон не принят сервером: {url}")
+        r.raise_for_status()
+        if not (r.status_code == 206 and r.headers.get("Content-Range", "").startswith(f"bytes {offset}-")):
+            offset = 0
+
+        length = r.headers.get("Content-Length")
+        encoded = r.headers.get("Content-Encoding", "identity") != "identity"
+        expected = offset + int(length) if length is not None and not encoded else None
+        total = expected if expected is not None else size
+        r.raw.decode_content = True
+
+        with open(part_path, "r+b" if offset else "wb") as f:
+            if offset:
+                if sha1 is not None:
+                    _hash_stream(f, sha1, offset)
+                f.seek(offset)
+                f.truncate()
+            preallocated = bool(total) and total > offset and _preallocate(f, offset, total)
+            # Пока файл предвыделен, его размер не равен скачанному — если
+            # процесс упадёт, такой .part докачивать нельзя
+            validator = _part_validator(r.headers)
+            write_json_atomic(meta_path, {"url": url, "validator": validator, "preallocated": preallocated})
+            try:
+                downloaded = _stream_to_file(r.raw, f, sha1, offset, total, progress, throttle)
+            finally:
+                if preallocated:
+                    write_json_atomic(meta_path, {"url": url, "validator": validator})
+
+    if expected is not None and downloaded != expected:
+        if downloaded < expected:
+            raise DownloadError(f"Соединение оборвалось, файл скачан не полностью: {url}")
+        _remove(part_path)
+        raise DownloadError(f"Размер не совпадает с Content-Length: {url}")
+    return downloaded
+
+
+def download_file(url, path, sha1=None, size=None, progress=None, session=None,
+                  retries=DOWNLOAD_RETRIES, timeout=30, throttle=None):
+    # Качает в path + ".part" и при обрыве докачивает через Range/If-Range.
+    # В итоговый путь файл попадает атомарно и только после проверки размера и хэша
+    session = session or get_session()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    part_path = path + ".part"
+    meta_path = part_path + ".json"
+    last_error = None
+    for attempt in range(retries):
+        try:
+            digest = hashlib.sha1() if sha1 is not None else None
+            _download_part(url, part_path, meta_path, size, progress, session, timeout, throttle, digest)
+            actual_size = os.path.getsize(part_path)
+            if size is not None and actual_size != size:
+                if actual_size < size:
+                    raise DownloadError(f"Файл скачан не полностью: {url}")
+                _remove(part_path)
+                raise DownloadError(f"Размер не совпадает: {url}")
+            if digest is not None and digest.hexdigest() != sha1:
+                _remove(part_path)
+                raise DownloadError(f"SHA1 не совпадает: {url}")
+            os.replace(part_path, path)
+            _remove(meta_path)
+            return path
+        except DownloadCancelled:
+            raise
+        except Exception as e:
+            last_error = e
+            if attempt + 1 < retries:
+                time.sleep(min(2 ** attempt, 5))
+    raise DownloadError(f"Не удалось скачать {url}: {last_error}")
+
+
+class DownloadEngine:
+    # Загрузка набора файлов: проверка уже скачанного идёт в локальном пуле
+    # потоков, а сами загрузки уходят в общий DownloadManager с заданным
+    # приоритетом. Прогресс отдаётся через словарь callback в формате
+    # minecraft_launcher_lib: setStatus / setProgress / setMax.
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, index=None, priority=None, manager=None, throttle=None):
+        from .download_manager import PRIORITY_LAUNCH, get_download_manager
+
+        self.concurrency = max(1, int(concurrency or DEFAULT_CONCURRENCY))
+        self.index = index  # VerifiedIndex: уже проверенные файлы не хэшируются повторно
+        self.priority = PRIORITY_LAUNCH if priority is None else priority
+        self.manager = manager or get_download_manager()
+        self.throttle = throttle  # дополнительный ограничитель для загрузок этого набора
+
+    def is_present(self, task):
+        if self.index is not None and task.sha1 and self.index.is_verified(task.path, task.sha1, task.size):
+            return True
+        if is_file_valid(task):
+            self._mark_verified(task)
+            return True
+        return False
+
+    def submit(self, task, progress=None):
+        return self.manager.submit(task.url, task.path, task.sha1, task.size,
+                                   priority=self.priority, progress=progress, throttle=self.throttle)
+
+    def fetch(self, task):
+        # True — файл скачан, False — уже был на месте
+        if self.is_present(task):
+            return False
+        self.submit(task).result()
+        self._mark_verified(task)
+        return True
+
+    def _mark_verified(self, task):
+        if self.index is not None and task.sha1:
+            self.index.mark_verified(task.path, task.sha1)
+
+    def flush(self):
+        if self.index is not None:
+            self.index.flush()
+
+    def download_all(self, tasks, callback=None, status=None, on_task_done=None):
+        # on_task_done(task) вызывается для каждого файла, который на месте или скачан
+        callback = callback or {}
+        on_task_done = on_task_done or _noop
+        # Одинаковые пути (общие библиотеки у разных версий) качаем один раз
+        tasks = list({task.path: task for task in tasks}.values())
+        if status:
+            callback.get("setStatus", _noop)(status)
+        callback.get("setMax", _noop)(len(tasks))
+        callback.get("setProgress", _noop)(0)
+
+        done = 0
+        missing = []
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, max(1, len(tasks)))) as pool:
+            for task, present in zip(tasks, pool.map(self.is_present, tasks)):
+                if present:
+                    done += 1
+                    on_task_done(task)
+                else:
+                    missing.append(task)
+        callback.get("setProgress", _noop)(done)
+
+        # Побайтовый прогресс (если потребитель его принимает) идёт мимо setProgress
+        report_bytes = callback.get("reportBytes")
+        finish_bytes = callback.get("finishBytes", _noop)
+        futures = {}
+        for task in missing:
+            progress = None
+            if report_bytes:
+                report_bytes(task.path, 0, task.size or 0)
+                progress = (lambda downloaded, total, key=task.path: report_bytes(key, downloaded, total))
+            futures[self.submit(task, progress)] = task
+
+        errors = []
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                future.result()
+                self._mark_verified(task)
+                on_task_done(task)
+            except Exception as e:
+                errors.append(e)
+            finish_bytes(task.path)
+            done += 1
+            callback.get("setProgress", _noop)(done)
+
+        self.flush()
+        if errors:
+            raise errors[0]
+
+
+def _noop(*args):
+    pass
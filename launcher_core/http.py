@@ -0,0 +1,23 @@
+import threading
+
+USER_AGENT = "SuperLauncher"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    # Общая сессия requests с пулом keep-alive соединений
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+    return _session
@@ -0,0 +1,511 @@
+import os
+import platform
+import re
+import shutil
+import sys
+import threading
+import zipfile
+from concurrent.futures import Future
+
+from .asset_index import asset_index_path, load_asset_index
+from .downloader import DownloadCancelled, DownloadEngine, DownloadTask
+from .files import read_json
+from .journal import get_install_journal, journal_mode
+from .manifest import get_manifest_cache
+from .verified_index import get_verified_index
+
+LIBRARIES_URL = "https://libraries.minecraft.net/"
+RESOURCES_URL = "https://resources.download.minecraft.net/"
+
+_installs = {}
+_installs_lock = threading.Lock()
+
+
+def get_os_name():
+    if sys.platform == "win32":
+        return "windows"
+    elif sys.platform == "darwin":
+        return "osx"
+    return "linux"
+
+
+def get_arch_bits():
+    return "64" if sys.maxsize > 2 ** 32 else "32"
+
+
+def rule_matches(rule, features=None):
+    # Проверяет условия правила (os/features), не глядя на action
+    os_rule = rule.get("os")
+    if os_rule:
+        if "name" in os_rule and os_rule["name"] != get_os_name():
+            return False
+        if os_rule.get("arch") == "x86" and get_arch_bits() != "32":
+            return False
+        if "version" in os_rule and not re.match(os_rule["version"], platform.version()):
+            return False
+    for feature, value in rule.get("features", {}).items():
+        if (features or {}).get(feature, False) != value:
+            return False
+    return True
+
+
+def rules_allow(rules, features=None):
+    if not rules:
+        return True
+    allowed = False
+    for rule in rules:
+        if rule_matches(rule, features):
+            allowed = rule.get("action") == "allow"
+    return allowed
+
+
+def library_path(name, classifier=None):
+    # "group:artifact:version[:classifier][@ext]" -> путь внутри libraries/
+    ext = "jar"
+    if "@" in name:
+        name, ext = name.rsplit("@", 1)
+    parts = name.split(":")
+    group, artifact, version = parts[0], parts[1], parts[2]
+    if classifier is None and len(parts) > 3:
+        classifier = parts[3]
+    filename = f"{artifact}-{version}-{classifier}.{ext}" if classifier else f"{artifact}-{version}.{ext}"
+    return "/".join([group.replace(".", "/"), artifact, version, filename])
+
+
+def get_native_classifier(lib):
+    classifier = lib.get("natives", {}).get(get_os_name())
+    if classifier:
+        return classifier.replace("${arch}", get_arch_bits())
+    return None
+
+
+def version_json_path(minecraft_directory, version_id):
+    return os.path.join(minecraft_directory, "versions", version_id, f"{version_id}.json")
+
+
+def inherit_version(child, parent):
+    # Слияние json наследника с родителем, как в minecraft_launcher_lib.utils.inherit_json
+    merged = dict(parent)
+    for key, value in child.items():
+        if isinstance(value, list) and isinstance(merged.get(key), list):
+            merged[key] = value + merged[key]
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            inner = dict(merged[key])
+            for inner_key, inner_value in value.items():
+                if isinstance(inner_value, list) and isinstance(inner.get(inner_key), list):
+                    inner[inner_key] = inner_value + inner[inner_key]
+                else:
+                    inner[inner_key] = inner_value
+            merged[key] = inner
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_version_chain(minecraft_directory, version_id):
+    # [json версии, json родителя, ...] по цепочке inheritsFrom
+    chain = []
+    seen = set()
+    while version_id and version_id not in seen:
+        seen.add(version_id)
+        data = read_json(version_json_path(minecraft_directory, version_id))
+        if data is None:
+            raise Exception(f"Версия {version_id} не установлена")
+        chain.append(data)
+        version_id = data.get("inheritsFrom")
+    return chain
+
+
+def load_version_data(minecraft_directory, version_id):
+    chain = load_version_chain(minecraft_directory, version_id)
+    data = chain[-1]
+    for child in reversed(chain[:-1]):
+        data = inherit_version(child, data)
+    return data
+
+
+def ensure_version_json(minecraft_directory, version_id, engine):
+    # Скачивает json версии (и родителей) из манифеста; локальные версии
+    # без записи в манифесте должны уже лежать в versions/
+    seen = set()
+    while version_id and version_id not in seen:
+        seen.add(version_id)
+        path = version_json_path(minecraft_directory, version_id)
+        remote = None
+        try:
+            remote = get_manifest_cache(minecraft_directory).find_version(version_id)
+        except Exception as e:
+            if not os.path.isfile(path):
+                raise
+            print("Манифест недоступен, используем локальный json:", e)
+        if remote is not None:
+            engine.fetch(DownloadTask(remote["url"], path, remote.get("sha1")))
+        elif not os.path.isfile(path):
+            raise Exception(f"Версия {version_id} не найдена")
+        version_id = (read_json(path) or {}).get("inheritsFrom")
+
+
+def ensure_asset_index(minecraft_directory, data, engine):
+    asset_index = data.get("assetIndex")
+    if not asset_index:
+        return None, None
+    index_path = asset_index_path(minecraft_directory, asset_index["id"])
+    engine.fetch(DownloadTask(asset_index["url"], index_path, asset_index.get("sha1"), asset_index.get("size")))
+    return asset_index["id"], load_asset_index(minecraft_directory, asset_index["id"])
+
+
+def collect_library_tasks(minecraft_directory, data):
+    # Возвращает (задачи загрузки, [(путь к jar с нативами, exclude)])
+    libraries_dir = os.path.join(minecraft_directory, "libraries")
+    tasks = []
+    natives = []
+    for lib in data.get("libraries", []):
+        if not rules_allow(lib.get("rules")):
+            continue
+        downloads = lib.get("downloads", {})
+        artifact = downloads.get("artifact")
+        if artifact and artifact.get("url"):
+            path = artifact.get("path") or library_path(lib["name"])
+            tasks.append(DownloadTask(artifact["url"], os.path.join(libraries_dir, path),
+                                      artifact.get("sha1"), artifact.get("size")))
+        elif not downloads and "natives" not in lib:
+            path = library_path(lib["name"])
+            base_url = lib.get("url") or LIBRARIES_URL
+            tasks.append(DownloadTask(base_url.rstrip("/") + "/" + path, os.path.join(libraries_dir, path),
+                                      lib.get("sha1"), lib.get("size")))
+
+        classifier = get_native_classifier(lib)
+        if classifier:
+            native = downloads.get("classifiers", {}).get(classifier)
+            if native:
+                path = native.get("path") or library_path(lib["name"], classifier)
+                task = DownloadTask(native["url"], os.path.join(libraries_dir, path),
+                                    native.get("sha1"), native.get("size"))
+            else:
+                path = library_path(lib["name"], classifier)
+                base_url = lib.get("url") or LIBRARIES_URL
+                task = DownloadTask(base_url.rstrip("/") + "/" + path, os.path.join(libraries_dir, path))
+            tasks.append(task)
+            natives.append((task.path, lib.get("extract", {}).get("exclude", [])))
+    return tasks, natives
+
+
+def collect_asset_tasks(minecraft_directory, asset_index, names=None):
+    # names — фильтр по именам ассетов (функция name -> bool)
+    if asset_index is None:
+        return []
+    objects_dir = os.path.join(minecraft_directory, "assets", "objects")
+    tasks = []
+    for name, obj_hash, size in asset_index.objects():
+        if names is not None and not names(name):
+            continue
+        tasks.append(DownloadTask(f"{RESOURCES_URL}{obj_hash[:2]}/{obj_hash}",
+                                  os.path.join(objects_dir, obj_hash[:2], obj_hash),
+                                  obj_hash, size))
+    return tasks
+
+
+def is_startup_asset(name, languages=("en_us",)):
+    # Звуки, музыка, встроенные ресурспаки и чужие языки клиент читает лениво —
+    # без них он доходит до главного меню. Остальное (sounds.json, иконки,
+    # выбранный язык) нужно на старте
+    if name.endswith("sounds.json"):
+        return True
+    if name.startswith(("minecraft/sounds/", "minecraft/music/", "minecraft/resourcepacks/")):
+        return False
+    if name.startswith("minecraft/lang/") or name.startswith("lang/"):
+        return os.path.splitext(os.path.basename(name))[0].lower() in languages
+    return True
+
+
+def read_game_language(game_directory):
+    # Язык клиента из options.txt ("lang:ru_ru"), en_us по умолчанию
+    try:
+        with open(os.path.join(game_directory, "options.txt"), encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.startswith("lang:"):
+                    return line[5:].strip().lower() or "en_us"
+    except OSError:
+        pass
+    return "en_us"
+
+
+def collect_client_tasks(minecraft_directory, chain):
+    # Клиентский jar берём у корневой (ванильной) версии цепочки
+    root = chain[-1]
+    tasks = []
+    client = root.get("downloads", {}).get("client")
+    if client:
+        jar_path = os.path.join(minecraft_directory, "versions", root["id"], f"{root['id']}.jar")
+        tasks.append(DownloadTask(client["url"], jar_path, client.get("sha1"), client.get("size")))
+    logging_file = root.get("logging", {}).get("client", {}).get("file")
+    if logging_file:
+        log_path = os.path.join(minecraft_directory, "assets", "log_configs", logging_file["id"])
+        tasks.append(DownloadTask(logging_file["url"], log_path, logging_file.get("sha1"), logging_file.get("size")))
+    return tasks
+
+
+def extract_natives(natives, natives_dir):
+    os.makedirs(natives_dir, exist_ok=True)
+    for jar_path, exclude in natives:
+        with zipfile.ZipFile(jar_path) as zf:
+            for name in zf.namelist():
+                if name.endswith("/") or any(name.startswith(prefix) for prefix in exclude):
+                    continue
+                target = os.path.join(natives_dir, name)
+                if not os.path.isfile(target):
+                    zf.extract(name, natives_dir)
+
+
+def copy_legacy_assets(minecraft_directory, index_id, asset_index):
+    # Старые версии (до 1.7) читают ресурсы не из objects/, а по именам
+    if asset_index.map_to_resources:
+        target_dir = os.path.join(minecraft_directory, "resources")
+    elif asset_index.virtual:
+        target_dir = os.path.join(minecraft_directory, "assets", "virtual", index_id)
+    else:
+        return
+    objects_dir = os.path.join(minecraft_directory, "assets", "objects")
+    for name, obj_hash, _ in asset_index.objects():
+        target = os.path.join(target_dir, name)
+        if not os.path.isfile(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(os.path.join(objects_dir, obj_hash[:2], obj_hash), target)
+
+
+def copy_inherited_jar(minecraft_directory, chain):
+    # Наследник (Fabric/Forge) запускается с jar родителя, как в minecraft_launcher_lib
+    if len(chain) < 2:
+        return
+    version_id = chain[0]["id"]
+    jar_path = os.path.join(minecraft_directory, "versions", version_id, f"{version_id}.jar")
+    parent_jar = os.path.join(minecraft_directory, "versions", chain[-1]["id"], f"{chain[-1]['id']}.jar")
+    if not os.path.isfile(jar_path) and os.path.isfile(parent_jar):
+        shutil.copyfile(parent_jar, jar_path)
+
+
+def get_jvm_platform():
+    # Имя платформы в манифесте Java-рантаймов Mojang
+    machine = platform.machine().lower()
+    if sys.platform == "win32":
+        if machine in ("arm64", "aarch64"):
+            return "windows-arm64"
+        return "windows-x64" if get_arch_bits() == "64" else "windows-x86"
+    if sys.platform == "darwin":
+        return "mac-os-arm64" if machine == "arm64" else "mac-os"
+    return "linux" if get_arch_bits() == "64" else "linux-i386"
+
+
+def runtime_java_path(minecraft_directory, component):
+    # Путь к java из рантайма Mojang, как его раскладывает minecraft_launcher_lib
+    home = os.path.join(minecraft_directory, "runtime", component, get_jvm_platform(), component)
+    if sys.platform == "darwin":
+        return os.path.join(home, "jre.bundle", "Contents", "Home", "bin", "java")
+    if sys.platform == "win32":
+        return os.path.join(home, "bin", "javaw.exe")
+    return os.path.join(home, "bin", "java")
+
+
+def install_java_runtime(minecraft_directory, data, callback, priority=None, throttle=None):
+    component = data.get("javaVersion", {}).get("component")
+    if component:
+        from .runtime import install_runtime
+
+        install_runtime(minecraft_directory, component, callback=callback, priority=priority, throttle=throttle)
+
+
+class InstallPlan:
+    # Всё, что нужно версии: json-цепочка, индекс ассетов и список файлов.
+    # deferred — ассеты, которые можно докачать уже после запуска игры
+    def __init__(self, version_id, chain, data, index_id, asset_index, tasks, natives, deferred=None):
+        self.version_id = version_id
+        self.chain = chain
+        self.data = data
+        self.index_id = index_id
+        self.asset_index = asset_index  # AssetIndex или None
+        self.tasks = tasks
+        self.natives = natives
+        self.deferred = deferred or []
+
+
+def plan_install(minecraft_directory, version_id, engine, callback=None, languages=None):
+    # languages задан — прогрессивная установка: в tasks только то, без чего
+    # игра не стартует, остальные ассеты уходят в plan.deferred
+    set_status = (callback or {}).get("setStatus", lambda value: None)
+
+    set_status("Download version json")
+    ensure_version_json(minecraft_directory, version_id, engine)
+    chain = load_version_chain(minecraft_directory, version_id)
+    data = load_version_data(minecraft_directory, version_id)
+
+    set_status("Download asset index")
+    index_id, asset_index = ensure_asset_index(minecraft_directory, data, engine)
+
+    library_tasks, natives = collect_library_tasks(minecraft_directory, data)
+    tasks = collect_client_tasks(minecraft_directory, chain) + library_tasks
+    deferred = []
+    # Старые версии копируют ассеты в virtual/ или resources/ при установке,
+    # поэтому им нужны все объекты сразу
+    legacy = asset_index is not None and asset_index.legacy
+    if languages is not None and not legacy:
+        tasks += collect_asset_tasks(minecraft_directory, asset_index, lambda name: is_startup_asset(name, languages))
+        deferred = collect_asset_tasks(minecraft_directory, asset_index,
+                                       lambda name: not is_startup_asset(name, languages))
+    else:
+        tasks += collect_asset_tasks(minecraft_directory, asset_index)
+    return InstallPlan(version_id, chain, data, index_id, asset_index, tasks, natives, deferred)
+
+
+def finish_install(minecraft_directory, plan, callback=None, priority=None, throttle=None):
+    set_status = (callback or {}).get("setStatus", lambda value: None)
+
+    set_status("Extract natives")
+    copy_inherited_jar(minecraft_directory, plan.chain)
+    extract_natives(plan.natives, os.path.join(minecraft_directory, "versions", plan.version_id, "natives"))
+    if plan.asset_index is not None:
+        copy_legacy_assets(minecraft_directory, plan.index_id, plan.asset_index)
+
+    install_java_runtime(minecraft_directory, plan.data, callback, priority, throttle)
+    set_status("Installation complete")
+
+
+class SharedCallback:
+    # Рассылает колбэки идущей установки всем, кто её ждёт; подключившиеся
+    # позже получают события с момента подключения
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def attach(self, callback):
+        with self._lock:
+            self._callbacks.append(callback or {})
+
+    def _forward(self, name):
+        def call(*args):
+            with self._lock:
+                callbacks = list(self._callbacks)
+            for callback in callbacks:
+                function = callback.get(name)
+                if function is not None:
+                    function(*args)
+        return call
+
+    def callback(self):
+        return {name: self._forward(name)
+                for name in ("setStatus", "setProgress", "setMax", "reportBytes", "finishBytes")}
+
+
+def download_deferred(minecraft_directory, tasks, concurrency=None, journal=None):
+    # Докачка отложенных ассетов в фоне с низким приоритетом: запуски и
+    # установки других версий в общем DownloadManager идут вперёд
+    from .download_manager import PRIORITY_BACKGROUND
+
+    if journal is not None:
+        if journal.deferred_running:
+            return None
+        journal.deferred_running = True
+
+    def run():
+        engine = DownloadEngine(concurrency, index=get_verified_index(minecraft_directory),
+                                priority=PRIORITY_BACKGROUND)
+        try:
+            engine.download_all(tasks, on_task_done=journal.mark_done if journal else None)
+            if journal is not None:
+                journal.mark_complete()
+            print(f"Фоновая загрузка ассетов завершена: {len(tasks)} файлов")
+        except Exception as e:
+            print("Ошибка фоновой загрузки ассетов:", e)
+        finally:
+            engine.flush()
+            if journal is not None:
+                journal.deferred_running = False
+
+    thread = threading.Thread(target=run, name="deferred-assets", daemon=True)
+    thread.start()
+    return thread
+
+
+def install_version(version_id, minecraft_directory, callback=None, concurrency=None, languages=None,
+                    priority=None, throttle=None):
+    # Одновременные установки одной версии (несколько запусков сразу)
+    # сливаются в одну: остальные ждут её результата и видят её прогресс.
+    # priority и throttle — для фоновых установок (см. prefetch.py)
+    key = (os.path.abspath(minecraft_directory), version_id)
+    while True:
+        with _installs_lock:
+            shared = _installs.get(key)
+            owner = shared is None
+            if owner:
+                shared = (Future(), SharedCallback())
+                _installs[key] = shared
+        future, shared_callback = shared
+        shared_callback.attach(callback)
+        if owner:
+            break
+        (callback or {}).get("setStatus", lambda value: None)(f"Waiting for {version_id} install")
+        try:
+            return future.result()
+        except DownloadCancelled:
+            # Фоновую установку прервали — дальше ставим сами
+            continue
+
+    try:
+        _install_version(version_id, minecraft_directory, shared_callback.callback(), concurrency, languages,
+                         priority, throttle)
+        future.set_result(None)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _installs_lock:
+            del _installs[key]
+
+
+def _install_version(version_id, minecraft_directory, callback=None, concurrency=None, languages=None,
+                     priority=None, throttle=None):
+    callback = callback or {}
+    set_status = callback.get("setStatus", lambda value: None)
+    journal = get_install_journal(minecraft_directory, version_id)
+    mode = journal_mode(languages)
+    state = journal.load(mode)
+    if state is not None and state.ready:
+        # Журнал подтверждает установку — без плана и хэшей, только stat
+        # библиотек и jar (ассетов слишком много) и проверка рантайма
+        missing = state.missing_files(skip_dir=os.path.join(minecraft_directory, "assets", "objects") + os.sep)
+        if missing:
+            print(f"Файлов версии {version_id} не хватает ({len(missing)}), проверяем установку заново")
+            journal.reset()
+            state = None
+    if state is not None and state.ready:
+        install_java_runtime(minecraft_directory, load_version_data(minecraft_directory, version_id), callback,
+                             priority, throttle)
+        deferred = state.pending(deferred=True)
+        if deferred and not state.complete:
+            download_deferred(minecraft_directory, deferred, concurrency, journal)
+        set_status("Installation complete")
+        return
+
+    engine = DownloadEngine(concurrency, index=get_verified_index(minecraft_directory),
+                            priority=priority, throttle=throttle)
+    try:
+        plan = plan_install(minecraft_directory, version_id, engine, callback, languages)
+        if state is not None:
+            # План мог обновить json цепочки — тогда старый журнал уже не годится
+            state = journal.load(mode)
+        if state is None:
+            journal.begin(plan, mode)
+            tasks, deferred = plan.tasks, plan.deferred
+        else:
+            # Прерванная установка: файлы, отмеченные в журнале, не перепроверяем
+            tasks, deferred = state.pending(deferred=False), state.pending(deferred=True)
+        engine.download_all(tasks, callback, status="Download libraries and assets",
+                            on_task_done=journal.mark_done)
+    finally:
+        engine.flush()
+
+    finish_install(minecraft_directory, plan, callback, priority, throttle)
+    journal.mark_ready()
+    if deferred:
+        download_deferred(minecraft_directory, deferred, concurrency, journal)
+    else:
+        journal.mark_complete()
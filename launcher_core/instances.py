@@ -0,0 +1,182 @@
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from .downloader import file_sha1
+from .files import read_json, write_json_atomic
+from .paths import get_launcher_directory
+
+INSTANCES_DIR_NAME = "instances"
+INSTANCE_FILE = "instance.json"
+STORE_DIR_NAME = "store"
+INSTANCE_SUBDIRS = ("mods", "config", "saves", "resourcepacks", "shaderpacks")
+# Папки, которые клиент ищет в gameDir, но которые лаунчер ведёт общими
+SHARED_GAME_DIRS = ("resources",)
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+@dataclass
+class Instance:
+    name: str
+    version_id: str = ""
+    created: float = 0.0
+    game_directory: str = ""
+
+
+def link_file(source, target):
+    # Жёсткая ссылка, если файлы на одном томе, иначе символическая, иначе копия
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.lexists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+        return "hardlink"
+    except OSError:
+        pass
+    try:
+        os.symlink(source, target)
+        return "symlink"
+    except OSError:
+        shutil.copyfile(source, target)
+        return "copy"
+
+
+def link_directory(source, target):
+    # Символическая ссылка на папку; в Windows без прав на symlink — junction
+    if os.path.lexists(target):
+        return
+    os.makedirs(source, exist_ok=True)
+    try:
+        os.symlink(source, target, target_is_directory=True)
+    except OSError:
+        if sys.platform != "win32":
+            raise
+        import _winapi
+
+        _winapi.CreateJunction(source, target)
+
+
+class ContentStore:
+    # Файлы по sha1 в .superlauncher/store/<2 символа>/<sha1>. В папки
+    # экземпляров они попадают ссылками, так что одинаковый мод в десяти
+    # экземплярах занимает место один раз.
+
+    def __init__(self, root):
+        self.root = root
+
+    def path_for(self, sha1):
+        return os.path.join(self.root, sha1[:2], sha1)
+
+    def has(self, sha1):
+        return os.path.isfile(self.path_for(sha1))
+
+    def link(self, sha1, target):
+        return link_file(self.path_for(sha1), target)
+
+    def adopt(self, path):
+        # Переносит уже скачанный файл в хранилище и оставляет на его месте ссылку
+        digest = file_sha1(path)
+        stored = self.path_for(digest)
+        if not os.path.isfile(stored):
+            os.makedirs(os.path.dirname(stored), exist_ok=True)
+            shutil.copyfile(path, stored + ".tmp")
+            os.replace(stored + ".tmp", stored)
+        self.link(digest, path)
+        return digest
+
+
+class InstanceManager:
+    # Именованные экземпляры в <minecraft>/instances/<имя>: у каждого свои
+    # mods, config, saves и options.txt, а версии, библиотеки, ассеты и
+    # рантаймы общие — команда запуска ссылается на них абсолютными путями.
+    # Пустое имя — обычная папка .minecraft.
+
+    def __init__(self, minecraft_directory):
+        self.minecraft_directory = minecraft_directory
+        self.instances_dir = os.path.join(minecraft_directory, INSTANCES_DIR_NAME)
+        self.store = ContentStore(os.path.join(get_launcher_directory(minecraft_directory), STORE_DIR_NAME))
+        self._lock = threading.Lock()
+
+    def game_directory(self, name):
+        if not name:
+            return self.minecraft_directory
+        return os.path.join(self.instances_dir, name)
+
+    def mods_directory(self, name):
+        return os.path.join(self.game_directory(name), "mods")
+
+    def list(self):
+        if not os.path.isdir(self.instances_dir):
+            return []
+        result = []
+        with os.scandir(self.instances_dir) as it:
+            for entry in it:
+                data = read_json(os.path.join(entry.path, INSTANCE_FILE)) if entry.is_dir() else None
+                if data is not None:
+                    result.append(Instance(**data, game_directory=entry.path))
+        return sorted(result, key=lambda instance: instance.name.lower())
+
+    def get(self, name):
+        data = read_json(os.path.join(self.game_directory(name), INSTANCE_FILE)) if name else None
+        return Instance(**data, game_directory=self.game_directory(name)) if data else None
+
+    def create(self, name, version_id=""):
+        name = name.strip()
+        if not name or not re.match(r"^[\w .\-]+$", name) or name in (".", ".."):
+            raise ValueError(f"Недопустимое имя экземпляра: {name!r}")
+        with self._lock:
+            game_dir = self.game_directory(name)
+            if os.path.exists(os.path.join(game_dir, INSTANCE_FILE)):
+                raise ValueError(f"Экземпляр {name} уже существует")
+            for subdir in INSTANCE_SUBDIRS:
+                os.makedirs(os.path.join(game_dir, subdir), exist_ok=True)
+            for shared in SHARED_GAME_DIRS:
+                link_directory(os.path.join(self.minecraft_directory, shared), os.path.join(game_dir, shared))
+            instance = Instance(name=name, version_id=version_id, created=time.time())
+            data = asdict(instance)
+            del data["game_directory"]
+            write_json_atomic(os.path.join(game_dir, INSTANCE_FILE), data, indent=2)
+            instance.game_directory = game_dir
+            return instance
+
+    def set_version(self, name, version_id):
+        instance = self.get(name)
+        if instance is not None and instance.version_id != version_id:
+            data = asdict(instance)
+            del data["game_directory"]
+            data["version_id"] = version_id
+            write_json_atomic(os.path.join(instance.game_directory, INSTANCE_FILE), data, indent=2)
+
+    def delete(self, name):
+        if not name:
+            raise ValueError("Основную папку .minecraft удалить нельзя")
+        game_dir = self.game_directory(name)
+        # Общие папки — ссылки, их содержимое не трогаем
+        for shared in SHARED_GAME_DIRS:
+            path = os.path.join(game_dir, shared)
+            if os.path.islink(path):
+                os.unlink(path)
+            elif os.path.isdir(path) and sys.platform == "win32":
+                os.rmdir(path)  # junction удаляется как пустая папка
+        shutil.rmtree(game_dir)
+
+    def install_mod(self, name, sha1, filename):
+        # Мод уже лежит в хранилище — ставим в экземпляр ссылкой
+        target = os.path.join(self.mods_directory(name), filename)
+        self.store.link(sha1, target)
+        return target
+
+
+def get_instance_manager(minecraft_directory):
+    with _managers_lock:
+        manager = _managers.get(minecraft_directory)
+        if manager is None:
+            manager = InstanceManager(minecraft_directory)
+            _managers[minecraft_directory] = manager
+        return manager
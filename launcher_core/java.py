@@ -0,0 +1,252 @@
+import glob
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from dataclasses import asdict, dataclass
+
+from .files import read_json, write_json_atomic
+from .paths import get_launcher_directory
+
+JAVA_CACHE_FILE = "java_runtimes.json"
+PROBE_TIMEOUT = 10
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+@dataclass
+class JavaRuntime:
+    path: str
+    version: str = ""
+    major: int = 0
+    vendor: str = ""
+    arch: str = ""
+    mtime_ns: int = 0
+    size: int = 0
+
+
+def java_executable_name():
+    return "javaw.exe" if sys.platform == "win32" else "java"
+
+
+def parse_major(version):
+    # "1.8.0_381" -> 8, "17.0.2" -> 17, "21" -> 21
+    match = re.match(r"(\d+)(?:\.(\d+))?", version or "")
+    if not match:
+        return 0
+    major = int(match.group(1))
+    if major == 1 and match.group(2):
+        return int(match.group(2))
+    return major
+
+
+def _java_home(executable):
+    return os.path.dirname(os.path.dirname(os.path.realpath(executable)))
+
+
+def _read_release_file(java_home):
+    # Файл release лежит в корне почти любой JDK/JRE начиная с 9 (и в
+    # большинстве сборок 8) — по нему версия известна без запуска java
+    values = {}
+    try:
+        with open(os.path.join(java_home, "release"), encoding="utf-8", errors="replace") as f:
+            for line in f:
+                key, sep, value = line.partition("=")
+                if sep:
+                    values[key.strip()] = value.strip().strip('"')
+    except OSError:
+        return None
+    if not values.get("JAVA_VERSION"):
+        return None
+    return values.get("JAVA_VERSION"), values.get("IMPLEMENTOR", ""), values.get("OS_ARCH", "")
+
+
+def _run_java_probe(executable):
+    # Запасной путь для сборок без файла release
+    console = executable
+    if sys.platform == "win32" and executable.lower().endswith("javaw.exe"):
+        candidate = executable[:-len("javaw.exe")] + "java.exe"
+        if os.path.isfile(candidate):
+            console = candidate
+    result = subprocess.run(
+        [console, "-XshowSettings:properties", "-version"],
+        capture_output=True, text=True, timeout=PROBE_TIMEOUT, errors="replace",
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+    )
+    properties = {}
+    for line in result.stderr.splitlines():
+        key, sep, value = line.strip().partition(" = ")
+        if sep:
+            properties[key] = value
+    if "java.version" not in properties:
+        return None
+    return properties["java.version"], properties.get("java.vendor", ""), properties.get("os.arch", "")
+
+
+def probe_java(executable):
+    try:
+        st = os.stat(executable)
+    except OSError:
+        return None
+    info = _read_release_file(_java_home(executable))
+    if info is None:
+        try:
+            info = _run_java_probe(executable)
+        except (OSError, subprocess.SubprocessError):
+            info = None
+    if info is None:
+        return None
+    version, vendor, arch = info
+    return JavaRuntime(path=executable, version=version, major=parse_major(version), vendor=vendor,
+                       arch=arch, mtime_ns=st.st_mtime_ns, size=st.st_size)
+
+
+def _search_roots():
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        roots = []
+        for base in {os.environ.get("ProgramFiles", r"C:\Program Files"),
+                     os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)")}:
+            for vendor in ("Java", "Eclipse Adoptium", "Eclipse Foundation", "AdoptOpenJDK", "Zulu",
+                           "Microsoft", "BellSoft", "Amazon Corretto", "Semeru"):
+                roots.append(os.path.join(base, vendor, "*"))
+        roots.append(os.path.join(home, ".jdks", "*"))
+        return roots
+    if sys.platform == "darwin":
+        return [
+            "/Library/Java/JavaVirtualMachines/*/Contents/Home",
+            os.path.join(home, "Library", "Java", "JavaVirtualMachines", "*", "Contents", "Home"),
+            os.path.join(home, ".sdkman", "candidates", "java", "*"),
+            "/opt/homebrew/opt/openjdk*/libexec/openjdk.jdk/Contents/Home",
+        ]
+    return [
+        "/usr/lib/jvm/*",
+        "/usr/lib64/jvm/*",
+        "/usr/java/*",
+        "/opt/java/*",
+        "/opt/jdk*",
+        os.path.join(home, ".jdks", "*"),
+        os.path.join(home, ".sdkman", "candidates", "java", "*"),
+    ]
+
+
+def find_java_candidates(extra_paths=()):
+    # Пути к исполняемым файлам java: заданные явно, JAVA_HOME, PATH и
+    # стандартные каталоги установки JDK для текущей ОС
+    name = java_executable_name()
+    candidates = [path for path in extra_paths if path]
+    java_home = os.environ.get("JAVA_HOME")
+    if java_home:
+        candidates.append(os.path.join(java_home, "bin", name))
+    on_path = shutil.which(name) or shutil.which("java")
+    if on_path:
+        candidates.append(on_path)
+    for pattern in _search_roots():
+        for home in glob.glob(pattern):
+            candidates.append(os.path.join(home, "bin", name))
+
+    result = []
+    seen = set()
+    for path in candidates:
+        if not os.path.isfile(path):
+            continue
+        real = os.path.realpath(path)
+        if real not in seen:
+            seen.add(real)
+            result.append(real)
+    return result
+
+
+class JavaManager:
+    # Найденные Java-рантаймы. Результат разбора каждого файла java
+    # хранится в .superlauncher/java_runtimes.json с его mtime и размером,
+    # поэтому повторный скан только делает stat — java запускается лишь для
+    # новых или обновлённых установок без файла release.
+
+    def __init__(self, minecraft_directory):
+        self.minecraft_directory = minecraft_directory
+        self.cache_path = os.path.join(get_launcher_directory(minecraft_directory), JAVA_CACHE_FILE)
+        self._lock = threading.Lock()
+        self._runtimes = None
+
+    def _probe_cached(self, path, cache):
+        cached = cache.get(path)
+        if cached is not None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            if cached.get("mtime_ns") == st.st_mtime_ns and cached.get("size") == st.st_size:
+                return JavaRuntime(**cached)
+        return probe_java(path)
+
+    def scan(self, extra_paths=()):
+        from .runtime import installed_runtime_executables
+
+        # Рантаймы Mojang из общего хранилища тоже годятся для режима "java"
+        extra_paths = list(extra_paths) + installed_runtime_executables(self.minecraft_directory)
+        with self._lock:
+            cache = read_json(self.cache_path, {})
+            runtimes = {}
+            for path in find_java_candidates(extra_paths):
+                runtime = self._probe_cached(path, cache)
+                if runtime is not None:
+                    runtimes[path] = runtime
+            self._runtimes = runtimes
+            if {path: asdict(runtime) for path, runtime in runtimes.items()} != cache:
+                try:
+                    write_json_atomic(self.cache_path, {path: asdict(r) for path, r in runtimes.items()}, indent=2)
+                except OSError as e:
+                    print("Не удалось сохранить список Java:", e)
+            return list(runtimes.values())
+
+    def runtimes(self):
+        if self._runtimes is None:
+            self.scan()
+        return list(self._runtimes.values())
+
+    def get(self, path):
+        # Сведения о конкретном файле java (например, указанном в настройках)
+        real = os.path.realpath(path)
+        runtimes = self._runtimes or {}
+        if real not in runtimes:
+            self.scan([path])
+        return (self._runtimes or {}).get(real)
+
+    def select(self, major):
+        # Точное совпадение мажорной версии, иначе ближайшая более новая;
+        # при равенстве — 64-битная
+        def score(runtime):
+            is_64 = "64" in runtime.arch
+            return (runtime.major != major, runtime.major - major, not is_64)
+
+        suitable = [r for r in self.runtimes() if r.major >= major]
+        if not suitable:
+            # Список мог устареть: install_version ставит рантаймы Mojang уже после первого скана
+            suitable = [r for r in self.scan() if r.major >= major]
+        return min(suitable, key=score) if suitable else None
+
+    def resolve(self, major, preferred_path=None):
+        if preferred_path:
+            runtime = self.get(preferred_path)
+            if runtime is None:
+                raise Exception(f"Java не найдена: {preferred_path}")
+            if runtime.major < major:
+                print(f"Внимание: версии нужна Java {major}, выбрана Java {runtime.major}")
+            return runtime.path
+        runtime = self.select(major)
+        if runtime is None:
+            raise Exception(f"Не найдена установленная Java {major} или новее")
+        return runtime.path
+
+
+def get_java_manager(minecraft_directory):
+    with _managers_lock:
+        manager = _managers.get(minecraft_directory)
+        if manager is None:
+            manager = JavaManager(minecraft_directory)
+            _managers[minecraft_directory] = manager
+        return manager
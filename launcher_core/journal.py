@@ -0,0 +1,228 @@
+import json
+import os
+import threading
+
+from .downloader import DownloadTask
+from .paths import get_launcher_directory
+
+JOURNAL_DIR_NAME = "journal"
+JOURNAL_VERSION = 1
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+def _chain_stats(minecraft_directory, chain_ids):
+    stats = []
+    for chain_id in chain_ids:
+        try:
+            st = os.stat(os.path.join(minecraft_directory, "versions", chain_id, f"{chain_id}.json"))
+        except OSError:
+            return None
+        stats.append([chain_id, st.st_mtime_ns, st.st_size])
+    return stats
+
+
+def _trim_torn_tail(path):
+    # Срезаем недописанную после сбоя строку, иначе новая запись склеится с ней
+    try:
+        with open(path, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if not size:
+                return
+            f.seek(max(0, size - 65536))
+            tail = f.read()
+            if tail.endswith(b"\n"):
+                return
+            cut = tail.rfind(b"\n")
+            f.truncate(size - len(tail) + cut + 1 if cut >= 0 else max(0, size - len(tail)))
+    except OSError:
+        pass
+
+
+def journal_mode(languages):
+    # Прогрессивная и полная установка делят файлы по-разному — это разные планы
+    return "progressive:" + ",".join(sorted(languages)) if languages is not None else "full"
+
+
+class JournalState:
+    def __init__(self, tasks, deferred, done, ready, complete):
+        self.tasks = tasks
+        self.deferred = deferred  # индексы отложенных задач
+        self.done = done  # индексы скачанных или уже проверенных файлов
+        self.ready = ready  # всё для запуска на месте, finish_install выполнен
+        self.complete = complete  # докачаны и отложенные файлы
+
+    def missing_files(self, skip_dir=None):
+        # Быстрая проверка готовой установки: только stat и размер файлов,
+        # нужных для запуска; skip_dir — папка, которую не проверяем (ассеты)
+        missing = []
+        for index, task in enumerate(self.tasks):
+            if index in self.deferred or (skip_dir and task.path.startswith(skip_dir)):
+                continue
+            try:
+                size = os.stat(task.path).st_size
+            except OSError:
+                missing.append(task)
+                continue
+            if task.size is not None and size != task.size:
+                missing.append(task)
+        return missing
+
+    def pending(self, deferred=False):
+        return [task for index, task in enumerate(self.tasks)
+                if index not in self.done and (index in self.deferred) == deferred]
+
+
+class InstallJournal:
+    # Журнал установки версии в .superlauncher/journal/<версия>.log.
+    # Каждая запись — строка JSON, файл только дописывается:
+    #   {"plan": ..., "mode": ..., "chain": [[id, mtime_ns, size], ...]}
+    #   {"task": [url, путь, sha1, size, отложен]}  — по строке на файл плана
+    #   {"done": i}  — файл i на месте
+    #   {"ready": true} / {"complete": true}
+    # Недописанная последняя строка после сбоя просто отбрасывается. План
+    # действителен, пока не менялись json-ы цепочки версии.
+
+    def __init__(self, minecraft_directory, version_id):
+        self.minecraft_directory = minecraft_directory
+        self.version_id = version_id
+        safe_id = "".join(c if c.isalnum() or c in "._-" else "_" for c in version_id)
+        self.path = os.path.join(get_launcher_directory(minecraft_directory), JOURNAL_DIR_NAME, f"{safe_id}.log")
+        self._lock = threading.Lock()
+        self._file = None
+        self._indexes = {}  # путь -> индекс задачи
+        self.deferred_running = False
+
+    def load(self, mode):
+        # JournalState для текущего плана или None, если журнала нет или он устарел.
+        # Законченная установка подходит для любого mode: все файлы уже на месте
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.read().split("\n")
+        except OSError:
+            return None
+        records = []
+        for line in lines[:-1]:  # после последнего \n — недописанный хвост
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                return None
+        if not records or records[0].get("plan") != JOURNAL_VERSION:
+            return None
+        header = records[0]
+        if _chain_stats(self.minecraft_directory, [item[0] for item in header["chain"]]) != header["chain"]:
+            return None
+
+        tasks, deferred, done = [], set(), set()
+        ready = complete = False
+        for record in records[1:]:
+            if "task" in record:
+                url, path, sha1, size, is_deferred = record["task"]
+                if is_deferred:
+                    deferred.add(len(tasks))
+                tasks.append(DownloadTask(url, os.path.join(self.minecraft_directory, path), sha1, size))
+            elif "done" in record:
+                done.add(record["done"])
+            elif record.get("ready"):
+                ready = True
+            elif record.get("complete"):
+                complete = True
+        if mode is not None and header.get("mode") != mode and not complete:
+            return None
+        with self._lock:
+            self._indexes = {task.path: index for index, task in enumerate(tasks)}
+        return JournalState(tasks, deferred, done, ready, complete)
+
+    def begin(self, plan, mode):
+        # Новый план пишется целиком во временный файл и подменяет старый журнал
+        header = {"plan": JOURNAL_VERSION, "mode": mode,
+                  "chain": _chain_stats(self.minecraft_directory, [data["id"] for data in plan.chain])}
+        tasks = [(task, False) for task in plan.tasks] + [(task, True) for task in plan.deferred]
+        with self._lock:
+            self._close()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(header) + "\n")
+                for task, is_deferred in tasks:
+                    path = os.path.relpath(task.path, self.minecraft_directory)
+                    f.write(json.dumps({"task": [task.url, path, task.sha1, task.size, is_deferred]}) + "\n")
+            os.replace(tmp_path, self.path)
+            self._indexes = {task.path: index for index, (task, _) in enumerate(tasks)}
+
+    def _append(self, record):
+        with self._lock:
+            if self._file is None:
+                _trim_torn_tail(self.path)
+                # Построчная буферизация: каждая запись сразу уходит в файл
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(json.dumps(record) + "\n")
+
+    def mark_done(self, task):
+        index = self._indexes.get(task.path)
+        if index is not None:
+            self._append({"done": index})
+
+    def mark_ready(self):
+        self._append({"ready": True})
+
+    def mark_complete(self):
+        self._append({"complete": True})
+        with self._lock:
+            self._close()
+
+    def reset(self):
+        with self._lock:
+            self._close()
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def get_install_journal(minecraft_directory, version_id):
+    key = (os.path.abspath(minecraft_directory), version_id)
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = InstallJournal(minecraft_directory, version_id)
+            _journals[key] = journal
+        return journal
+
+
+def invalidate_install_journals(minecraft_directory, version_ids=None):
+    # После repair и очистки файлы могли поменяться — журналы этих версий
+    # (или все, если version_ids не задан) больше не подтверждают установку
+    if version_ids is not None:
+        for version_id in version_ids:
+            get_install_journal(minecraft_directory, version_id).reset()
+        return
+    root = os.path.abspath(minecraft_directory)
+    with _journals_lock:
+        journals = [journal for (mc, _), journal in _journals.items() if mc == root]
+    for journal in journals:
+        journal.reset()
+    journal_dir = os.path.join(get_launcher_directory(minecraft_directory), JOURNAL_DIR_NAME)
+    try:
+        names = os.listdir(journal_dir)
+    except OSError:
+        return
+    for name in names:
+        if name.endswith(".log"):
+            try:
+                os.remove(os.path.join(journal_dir, name))
+            except OSError:
+                pass
+
+
+def is_version_installed(minecraft_directory, version_id):
+    # Версия установлена полностью, если её актуальный журнал закрыт записью complete
+    state = get_install_journal(minecraft_directory, version_id).load(None)
+    return state is not None and state.complete
@@ -0,0 +1,141 @@
+import os
+import shlex
+import sys
+
+from .versions import get_version_catalog
+
+GC_DEFAULT = "default"
+GC_G1 = "g1"
+GC_ZGC = "zgc"
+GC_CHOICES = (GC_G1, GC_ZGC, GC_DEFAULT)
+
+MIN_HEAP_MB = 1024
+AUTO_HEAP_VANILLA_MB = 4096
+AUTO_HEAP_MODDED_MB = 10240
+
+# Флаги G1 для коротких пауз при большом потоке короткоживущих объектов
+# (чанки, сущности модов). Молодое поколение держим крупным, а старое
+# начинаем собирать рано, чтобы не доходить до полных сборок
+G1_FLAGS = [
+    "-XX:+UseG1GC",
+    "-XX:+ParallelRefProcEnabled",
+    "-XX:MaxGCPauseMillis=200",
+    "-XX:+UnlockExperimentalVMOptions",
+    "-XX:+DisableExplicitGC",
+    "-XX:G1NewSizePercent=30",
+    "-XX:G1MaxNewSizePercent=40",
+    "-XX:G1HeapRegionSize=8M",
+    "-XX:G1ReservePercent=20",
+    "-XX:G1HeapWastePercent=5",
+    "-XX:G1MixedGCCountTarget=4",
+    "-XX:InitiatingHeapOccupancyPercent=15",
+    "-XX:G1MixedGCLiveThresholdPercent=90",
+    "-XX:G1RSetUpdatingPauseTimePercent=5",
+    "-XX:SurvivorRatio=32",
+    "-XX:+PerfDisableSharedMem",
+    "-XX:MaxTenuringThreshold=1",
+]
+
+ZGC_FLAGS = [
+    "-XX:+UseZGC",
+    "-XX:+DisableExplicitGC",
+    "-XX:+PerfDisableSharedMem",
+]
+
+
+def get_total_memory_mb():
+    # Объём RAM без psutil; None, если узнать не удалось
+    try:
+        if sys.platform == "win32":
+            import ctypes
+
+            class MemoryStatus(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong),
+                    ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong),
+                    ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong),
+                    ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong),
+                    ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+
+            status = MemoryStatus()
+            status.dwLength = ctypes.sizeof(MemoryStatus)
+            ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status))
+            return status.ullTotalPhys // (1024 * 1024)
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def auto_heap_mb(modded, total_mb=None):
+    # Модам нужно больше кучи, но системе и видеодрайверу оставляем не меньше половины RAM
+    total_mb = get_total_memory_mb() if total_mb is None else total_mb
+    target = AUTO_HEAP_MODDED_MB if modded else AUTO_HEAP_VANILLA_MB
+    if not total_mb:
+        return min(target, AUTO_HEAP_VANILLA_MB)
+    heap = min(target, total_mb // 2)
+    return max(MIN_HEAP_MB, heap // 512 * 512)
+
+
+def get_jvm_profile(config, version_id):
+    # Общие настройки из config, поверх них — профиль конкретной версии
+    profile = {
+        "ram": config.get("ram", AUTO_HEAP_VANILLA_MB),
+        "gc": config.get("gc", GC_G1),
+        "jvm_args": config.get("jvm_args", ""),
+    }
+    profile.update(config.get("jvm_profiles", {}).get(version_id, {}))
+    return profile
+
+
+def gc_flags(gc, java_major):
+    if gc == GC_ZGC and java_major >= 15:
+        flags = list(ZGC_FLAGS)
+        # В 21–22 поколенческий ZGC включается флагом, с 23 он по умолчанию
+        if 21 <= java_major < 23:
+            flags.insert(1, "-XX:+ZGenerational")
+        return flags
+    if gc in (GC_G1, GC_ZGC):
+        # ZGC на старой Java недоступен — берём G1
+        return list(G1_FLAGS)
+    return []
+
+
+def build_jvm_arguments(profile, modded, java_major):
+    ram = int(profile.get("ram") or 0)
+    heap = ram if ram > 0 else auto_heap_mb(modded)
+    # Xms = Xmx: куча не растёт рывками во время игры. AlwaysPreTouch не ставим —
+    # он размечает всю кучу до старта и заметно удлиняет запуск
+    args = [f"-Xms{heap}M", f"-Xmx{heap}M"]
+    args += gc_flags(profile.get("gc", GC_G1), java_major)
+    args += shlex.split(profile.get("jvm_args", "") or "", posix=os.name != "nt")
+    return args
+
+
+def get_version_java_major(minecraft_directory, version_id):
+    # Сначала подхватываем json-ы с диска: сразу после установки в каталоге
+    # ещё удалённая запись без javaVersion, и вышла бы Java 8
+    catalog = get_version_catalog(minecraft_directory)
+    catalog.refresh_local()
+    seen = set()
+    while version_id and version_id not in seen:
+        seen.add(version_id)
+        entry = catalog.get(version_id)
+        if entry is None:
+            break
+        if entry.java_major:
+            return entry.java_major
+        version_id = entry.inherits_from
+    # Версии без javaVersion в json рассчитаны на Java 8
+    return 8
+
+
+def get_jvm_arguments(minecraft_directory, version_id, config):
+    java_major = get_version_java_major(minecraft_directory, version_id)
+    entry = get_version_catalog(minecraft_directory).get(version_id)
+    modded = entry is not None and entry.loader != "vanilla"
+    return build_jvm_arguments(get_jvm_profile(config, version_id), modded, java_major)
@@ -0,0 +1,250 @@
+import os
+import threading
+
+from .asset_index import load_asset_index
+from .files import read_json, write_json_atomic
+from .install import (get_native_classifier, inherit_version, library_path, load_version_chain,
+                      rules_allow, runtime_java_path, version_json_path)
+from .paths import get_launcher_directory
+
+LAUNCHER_NAME = "SuperLauncher"
+LAUNCHER_VERSION = "1.0"
+LAUNCH_CACHE_FILE = "launch_commands.json"
+LAUNCH_CACHE_VERSION = 2
+
+# Значения, которые меняются от запуска к запуску и подставляются в готовый шаблон
+# (папка игры своя у каждого экземпляра)
+SESSION_PLACEHOLDERS = ("auth_player_name", "auth_uuid", "auth_access_token", "auth_session",
+                        "user_type", "clientid", "auth_xuid", "game_directory")
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def generate_offline_username():
+    from random_username.generate import generate_username
+
+    return generate_username()[0]
+
+
+def _stat_fingerprint(minecraft_directory, ids):
+    # (id, mtime_ns, размер) каждого json в цепочке версии: список библиотек
+    # и аргументы берутся только из них, поэтому этого достаточно для проверки
+    fingerprint = []
+    for chain_id in ids:
+        try:
+            st = os.stat(version_json_path(minecraft_directory, chain_id))
+        except OSError:
+            return None
+        fingerprint.append([chain_id, st.st_mtime_ns, st.st_size])
+    return fingerprint
+
+
+def build_classpath(minecraft_directory, data):
+    libraries_dir = os.path.join(minecraft_directory, "libraries")
+    paths = []
+    for lib in data.get("libraries", []):
+        if not rules_allow(lib.get("rules")):
+            continue
+        artifact = lib.get("downloads", {}).get("artifact")
+        if artifact and artifact.get("path"):
+            paths.append(os.path.join(libraries_dir, artifact["path"]))
+        elif "natives" not in lib or artifact:
+            paths.append(os.path.join(libraries_dir, library_path(lib["name"])))
+        classifier = get_native_classifier(lib)
+        if classifier:
+            native = lib.get("downloads", {}).get("classifiers", {}).get(classifier, {})
+            paths.append(os.path.join(libraries_dir, native.get("path") or library_path(lib["name"], classifier)))
+    jar_id = data.get("jar", data["id"])
+    paths.append(os.path.join(minecraft_directory, "versions", jar_id, f"{jar_id}.jar"))
+    # Наследники дублируют библиотеки родителя — оставляем первое вхождение
+    return list(dict.fromkeys(paths))
+
+
+def _collect_arguments(arguments, features):
+    result = []
+    for argument in arguments:
+        if isinstance(argument, str):
+            result.append(argument)
+        elif rules_allow(argument.get("rules"), features):
+            value = argument.get("value", [])
+            result.extend([value] if isinstance(value, str) else value)
+    return result
+
+
+def _game_assets_dir(minecraft_directory, data):
+    index_id = data.get("assets") or data.get("assetIndex", {}).get("id", "")
+    asset_index = load_asset_index(minecraft_directory, index_id) if index_id else None
+    if asset_index is not None and asset_index.map_to_resources:
+        return os.path.join(minecraft_directory, "resources")
+    if asset_index is not None and asset_index.virtual:
+        return os.path.join(minecraft_directory, "assets", "virtual", index_id)
+    return os.path.join(minecraft_directory, "assets")
+
+
+def _substitute(argument, values):
+    if "${" not in argument:
+        return argument
+    for key, value in values.items():
+        argument = argument.replace("${" + key + "}", value)
+    return argument
+
+
+class LaunchTemplate:
+    # Готовая команда запуска версии: classpath и все аргументы уже
+    # разрешены, остаются только плейсхолдеры SESSION_PLACEHOLDERS
+    __slots__ = ("version_id", "key", "fingerprint", "args")
+
+    def __init__(self, version_id, key, fingerprint, args):
+        self.version_id = version_id
+        self.key = key
+        self.fingerprint = fingerprint
+        self.args = args
+
+    def render(self, options):
+        values = {
+            "auth_player_name": options.get("username", "player"),
+            "auth_uuid": options.get("uuid", ""),
+            "auth_access_token": options.get("token", ""),
+            "auth_session": options.get("token", ""),
+            "user_type": "msa",
+            "clientid": options.get("clientid", ""),
+            "auth_xuid": options.get("xuid", ""),
+            "game_directory": options["gameDirectory"],
+        }
+        executable = self.args[0]
+        if os.path.isabs(executable) and not os.path.isfile(executable):
+            executable = "java"
+        return [executable] + [_substitute(argument, values) for argument in self.args[1:]]
+
+
+def build_launch_template(minecraft_directory, version_id, executable=None, jvm_arguments=()):
+    chain = load_version_chain(minecraft_directory, version_id)
+    fingerprint = _stat_fingerprint(minecraft_directory, [data["id"] for data in chain])
+    data = chain[-1]
+    for child in reversed(chain[:-1]):
+        data = inherit_version(child, data)
+
+    if not executable:
+        # Рантайм Mojang мог ещё не скачаться — тогда render() возьмёт java из PATH
+        component = data.get("javaVersion", {}).get("component")
+        executable = runtime_java_path(minecraft_directory, component) if component else "java"
+
+    classpath = build_classpath(minecraft_directory, data)
+    values = {
+        "natives_directory": os.path.join(minecraft_directory, "versions", data["id"], "natives"),
+        "launcher_name": LAUNCHER_NAME,
+        "launcher_version": LAUNCHER_VERSION,
+        "classpath": os.pathsep.join(classpath),
+        "classpath_separator": os.pathsep,
+        "library_directory": os.path.join(minecraft_directory, "libraries"),
+        "version_name": data["id"],
+        "assets_root": os.path.join(minecraft_directory, "assets"),
+        "game_assets": _game_assets_dir(minecraft_directory, data),
+        "assets_index_name": data.get("assets") or data.get("assetIndex", {}).get("id", ""),
+        "version_type": data.get("type", "release"),
+        "user_properties": "{}",
+    }
+
+    args = [executable] + list(jvm_arguments)
+    if "arguments" in data:
+        args += _collect_arguments(data["arguments"].get("jvm", []), {})
+    else:
+        args += [
+            "-Djava.library.path=${natives_directory}",
+            "-Dminecraft.launcher.brand=${launcher_name}",
+            "-Dminecraft.launcher.version=${launcher_version}",
+            "-cp", "${classpath}",
+        ]
+    args.append(data["mainClass"])
+    if "arguments" in data:
+        args += _collect_arguments(data["arguments"].get("game", []), {})
+    else:
+        args += data.get("minecraftArguments", "").split()
+
+    args = [_substitute(argument, values) for argument in args]
+    key = _template_key(version_id, executable_key(executable, jvm_arguments))
+    return LaunchTemplate(version_id, key, fingerprint, args)
+
+
+def executable_key(executable, jvm_arguments):
+    return "\0".join([executable or ""] + list(jvm_arguments))
+
+
+def _template_key(version_id, profile_key):
+    return f"{version_id}\0{profile_key}"
+
+
+class LaunchCommandCache:
+    # Кэш шаблонов команд по (версия, профиль запуска). Шаблон считается
+    # действительным, пока не менялись mtime/размер json-ов цепочки версии,
+    # поэтому при нажатии «Играть» проверяется пара stat, а не весь classpath.
+    # Кэш хранится в .superlauncher/launch_commands.json и переживает перезапуск.
+
+    def __init__(self, minecraft_directory):
+        self.minecraft_directory = minecraft_directory
+        self.cache_path = os.path.join(get_launcher_directory(minecraft_directory), LAUNCH_CACHE_FILE)
+        self._lock = threading.Lock()
+        self._templates = None
+
+    def _load(self):
+        if self._templates is None:
+            self._templates = {}
+            cached = read_json(self.cache_path, {})
+            if cached.get("version") == LAUNCH_CACHE_VERSION:
+                for key, item in cached.get("templates", {}).items():
+                    self._templates[key] = LaunchTemplate(item["version_id"], key, item["fingerprint"], item["args"])
+        return self._templates
+
+    def _save(self):
+        templates = {
+            key: {"version_id": t.version_id, "fingerprint": t.fingerprint, "args": t.args}
+            for key, t in self._templates.items()
+        }
+        try:
+            write_json_atomic(self.cache_path, {"version": LAUNCH_CACHE_VERSION, "templates": templates})
+        except OSError as e:
+            print("Не удалось сохранить кэш команд запуска:", e)
+
+    def _is_fresh(self, template):
+        ids = [item[0] for item in template.fingerprint or []]
+        return bool(ids) and _stat_fingerprint(self.minecraft_directory, ids) == template.fingerprint
+
+    def get(self, version_id, executable=None, jvm_arguments=()):
+        key = _template_key(version_id, executable_key(executable, jvm_arguments))
+        with self._lock:
+            template = self._load().get(key)
+            if template is not None and self._is_fresh(template):
+                return template
+        template = build_launch_template(self.minecraft_directory, version_id, executable, jvm_arguments)
+        with self._lock:
+            self._templates[key] = template
+            self._save()
+        return template
+
+    def invalidate(self, version_id=None):
+        with self._lock:
+            templates = self._load()
+            for key in [k for k, t in templates.items() if version_id is None or t.version_id == version_id]:
+                del templates[key]
+            self._save()
+
+
+def get_launch_command_cache(minecraft_directory):
+    with _caches_lock:
+        cache = _caches.get(minecraft_directory)
+        if cache is None:
+            cache = LaunchCommandCache(minecraft_directory)
+            _caches[minecraft_directory] = cache
+        return cache
+
+
+def get_launch_command(version_id, minecraft_directory, options):
+    # options в формате minecraft_launcher_lib: username, uuid, token,
+    # gameDirectory, а также executablePath и jvmArguments для профиля запуска
+    options = dict(options)
+    options["gameDirectory"] = options.get("gameDirectory") or minecraft_directory
+    template = get_launch_command_cache(minecraft_directory).get(
+        version_id, options.get("executablePath"), tuple(options.get("jvmArguments", ()))
+    )
+    return template.render(options)
@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+
+from .files import read_json, write_json_atomic
+from .http import get_session
+from .paths import get_launcher_directory
+
+VERSION_MANIFEST_URL = "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
+DEFAULT_MANIFEST_TTL = 600  # секунд
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+class ManifestCache:
+    # Манифест версий Mojang на диске. Свежий кэш отдаётся сразу, устаревший
+    # тоже отдаётся сразу, а в фоне перепроверяется по ETag/Last-Modified.
+    # Без сети работает на последней сохранённой копии.
+
+    def __init__(self, cache_dir, url=VERSION_MANIFEST_URL, ttl=DEFAULT_MANIFEST_TTL,
+                 filename="version_manifest_v2.json"):
+        self.path = os.path.join(cache_dir, filename)
+        self.meta_path = self.path + ".meta"
+        self.url = url
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._meta = {}
+        self._loaded = False
+        self._refresh_thread = None
+        self._listeners = []
+
+    def add_listener(self, callback):
+        # callback(manifest) вызывается из фонового потока, когда манифест изменился
+        self._listeners.append(callback)
+
+    def _load(self):
+        with self._lock:
+            if not self._loaded:
+                self._manifest = read_json(self.path)
+                self._meta = read_json(self.meta_path, {}) if self._manifest is not None else {}
+                self._loaded = True
+            return self._manifest, self._meta
+
+    def is_stale(self):
+        _, meta = self._load()
+        return time.time() - meta.get("fetched_at", 0) > self.ttl
+
+    def get(self, wait=False):
+        manifest, _ = self._load()
+        if manifest is None:
+            return self.refresh()
+        if self.is_stale():
+            if wait:
+                return self.refresh()
+            self.refresh_async()
+        return manifest
+
+    def refresh(self):
+        manifest, meta = self._load()
+        headers = {}
+        if manifest is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            resp = get_session().get(self.url, headers=headers, timeout=15)
+            if resp.status_code == 304 and manifest is not None:
+                meta = dict(meta, fetched_at=time.time())
+                changed = False
+            else:
+                resp.raise_for_status()
+                manifest = resp.json()
+                meta = {
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                }
+                write_json_atomic(self.path, manifest)
+                changed = True
+            write_json_atomic(self.meta_path, meta)
+        except Exception as e:
+            if manifest is None:
+                raise
+            print("Не удалось обновить манифест версий, используем кэш:", e)
+            return manifest
+
+        with self._lock:
+            self._manifest = manifest
+            self._meta = meta
+        if changed:
+            for callback in list(self._listeners):
+                try:
+                    callback(manifest)
+                except Exception as e:
+                    print("Ошибка обработчика манифеста:", e)
+        return manifest
+
+    def refresh_async(self):
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self._refresh_quietly, daemon=True)
+            self._refresh_thread.start()
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print("Манифест версий недоступен:", e)
+
+    def get_version_list(self):
+        manifest = self.get()
+        return [
+            {
+                "id": v["id"],
+                "type": v["type"],
+                "releaseTime": v["releaseTime"],
+                "complianceLevel": v.get("complianceLevel", 0),
+            }
+            for v in manifest["versions"]
+        ]
+
+    def find_version(self, version_id):
+        manifest = self.get()
+        for v in manifest["versions"]:
+            if v["id"] == version_id:
+                return v
+        return None
+
+    def latest(self):
+        return self.get()["latest"]
+
+
+def get_manifest_cache(minecraft_directory, ttl=None):
+    # Один общий кэш на папку Minecraft
+    with _caches_lock:
+        cache = _caches.get(minecraft_directory)
+        if cache is None:
+            cache = ManifestCache(get_launcher_directory(minecraft_directory))
+            _caches[minecraft_directory] = cache
+    if ttl is not None:
+        cache.ttl = ttl
+    return cache
@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+
+# Служебная папка лаунчера внутри .minecraft (кэши, индексы)
+LAUNCHER_DIR_NAME = ".superlauncher"
+
+
+def get_minecraft_directory() -> str:
+    # Повторяет minecraft_launcher_lib.utils.get_minecraft_directory,
+    # чтобы не импортировать библиотеку ради одного пути
+    if sys.platform == "win32":
+        appdata = os.getenv("APPDATA", os.path.join(os.path.expanduser("~"), "AppData", "Roaming"))
+        return os.path.join(appdata, ".minecraft")
+    elif sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", "minecraft")
+    return os.path.join(os.path.expanduser("~"), ".minecraft")
+
+
+def get_launcher_directory(minecraft_directory: str) -> str:
+    return os.path.join(minecraft_directory, LAUNCHER_DIR_NAME)
+
+
+def prepare_minecraft_directory(minecraft_directory: str) -> None:
+    # Создаёт папку Minecraft и пустой launcher_profiles.json, если их нет.
+    # Вызывается явно при старте приложения, а не при импорте
+    print("Path to Minecraft:", minecraft_directory)
+    if not os.path.exists(minecraft_directory):
+        print("Minecraft folder not found! Creating...")
+        os.makedirs(minecraft_directory, exist_ok=True)
+
+    profile_path = os.path.join(minecraft_directory, 'launcher_profiles.json')
+    if not os.path.isfile(profile_path):
+        print("launcher_profiles.json not found, creating new...")
+        empty_profile = {
+            "profiles": {},
+            "settings": {},
+            "selectedProfile": None
+        }
+        with open(profile_path, 'w', encoding='utf-8') as f:
+            json.dump(empty_profile, f, indent=4)
+        print("Empty launcher_profiles.json created")
@@ -0,0 +1,155 @@
+import os
+import threading
+
+from .download_manager import PRIORITY_BACKGROUND, RateLimiter
+from .downloader import DownloadCancelled, file_sha1
+from .install import install_version, version_json_path
+from .journal import get_install_journal, is_version_installed
+from .manifest import get_manifest_cache
+from .process import get_process_supervisor
+from .versions import get_version_catalog
+
+PREFETCH_INTERVAL = 300  # секунд между проверками манифеста
+IDLE_RECHECK = 15  # как часто проверять, освободился ли лаунчер
+
+_prefetchers = {}
+_prefetchers_lock = threading.Lock()
+
+
+class Prefetcher:
+    # Фоновая подкачка в простое: последний релиз из манифеста и обновлённые
+    # json уже установленных версий (новые библиотеки) ставятся обычным
+    # install_version, но с приоритетом PRIORITY_BACKGROUND и своим лимитом
+    # скорости. Пока идёт запуск (hold) или работает игра, фоновые загрузки
+    # прерываются через DownloadCancelled, а .part-файлы и журнал установки
+    # позволяют потом продолжить с того же места.
+
+    def __init__(self, minecraft_directory, interval=PREFETCH_INTERVAL):
+        self.minecraft_directory = minecraft_directory
+        self.interval = interval
+        self.enabled = False
+        self.concurrency = 4
+        self.limiter = RateLimiter()
+        self._lock = threading.Lock()
+        self._holds = 0
+        self._wake = threading.Event()
+        self._thread = None
+
+    def configure(self, enabled, bandwidth_limit=0):
+        self.enabled = bool(enabled)
+        self.limiter.bytes_per_second = max(0, int(bandwidth_limit))
+        if self.enabled:
+            self.start()
+        self._wake.set()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+                self._thread.start()
+
+    # Запуск игры держит подкачку на паузе от начала установки до старта процесса,
+    # дальше паузу держит сам работающий процесс
+    def hold(self):
+        with self._lock:
+            self._holds += 1
+
+    def release(self):
+        with self._lock:
+            self._holds = max(0, self._holds - 1)
+        self._wake.set()
+
+    def is_idle(self):
+        with self._lock:
+            if self._holds:
+                return False
+        return not get_process_supervisor().running()
+
+    def throttle(self, amount):
+        # throttle для фоновых загрузок: пауза прерывает их, иначе — свой лимит
+        if not self.enabled or not self.is_idle():
+            raise DownloadCancelled("Фоновая загрузка приостановлена")
+        self.limiter.consume(amount)
+
+    def _run(self):
+        # Первая проверка — не сразу, чтобы не мешать старту лаунчера
+        timeout = IDLE_RECHECK
+        while True:
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if not self.enabled:
+                return
+            timeout = IDLE_RECHECK
+            if not self.is_idle():
+                continue
+            try:
+                self.run_once()
+                timeout = self.interval
+            except DownloadCancelled:
+                pass
+            except Exception as e:
+                print("Ошибка фоновой подкачки версий:", e)
+                timeout = self.interval
+
+    def pending_versions(self):
+        # [(id, json устарел)]: последний релиз, если он ещё не установлен,
+        # и установленные версии, чей json в манифесте поменялся
+        manifest = get_manifest_cache(self.minecraft_directory).get()
+        remote = {v["id"]: v for v in manifest.get("versions", [])}
+        result = []
+        latest = manifest.get("latest", {}).get("release")
+        if latest and not is_version_installed(self.minecraft_directory, latest):
+            result.append((latest, False))
+
+        versions_dir = os.path.join(self.minecraft_directory, "versions")
+        try:
+            installed = [entry.name for entry in os.scandir(versions_dir) if entry.is_dir()]
+        except OSError:
+            installed = []
+        for version_id in installed:
+            entry = remote.get(version_id)
+            if entry is None or not entry.get("sha1"):
+                continue
+            path = version_json_path(self.minecraft_directory, version_id)
+            try:
+                outdated = file_sha1(path) != entry["sha1"]
+            except OSError:
+                continue
+            if outdated:
+                result = [item for item in result if item[0] != version_id]
+                result.append((version_id, True))
+        return result
+
+    def run_once(self):
+        installed = set()
+        for version_id, outdated in self.pending_versions():
+            if not self.enabled or not self.is_idle():
+                raise DownloadCancelled("Фоновая подкачка приостановлена")
+            print("Фоновая подкачка версии", version_id)
+            if outdated:
+                # Журнал готовой установки иначе не дал бы перечитать json
+                get_install_journal(self.minecraft_directory, version_id).reset()
+            install_version(
+                version_id, self.minecraft_directory, concurrency=self.concurrency,
+                priority=PRIORITY_BACKGROUND, throttle=self.throttle
+            )
+            get_version_catalog(self.minecraft_directory).invalidate(version_id)
+            installed.add(version_id)
+        return installed
+
+
+def get_prefetcher(minecraft_directory):
+    with _prefetchers_lock:
+        prefetcher = _prefetchers.get(minecraft_directory)
+        if prefetcher is None:
+            prefetcher = Prefetcher(minecraft_directory)
+            _prefetchers[minecraft_directory] = prefetcher
+        return prefetcher
+
+
+def configure_prefetch(minecraft_directory, config):
+    # Применяет настройки фоновой подкачки
+    get_prefetcher(minecraft_directory).configure(
+        config.get("prefetch", False),
+        bandwidth_limit=int(config.get("prefetch_limit_kbps", 0) or 0) * 1024,
+    )
@@ -0,0 +1,174 @@
+import subprocess
+import threading
+import time
+from collections import deque
+
+from .cds import STARTUP_MARKERS
+
+LOG_BUFFER_LINES = 5000
+KEEP_FINISHED = 5  # сколько завершённых игр держать ради их лога
+
+STATE_STARTING = "starting"
+STATE_RUNNING = "running"
+STATE_EXITED = "exited"
+STATE_CRASHED = "crashed"
+
+# Строки, по которым видно, что игра или JVM упала
+CRASH_MARKERS = (
+    "---- Minecraft Crash Report ----",
+    "#@!@# Game crashed!",
+    "A fatal error has been detected by the Java Runtime Environment",
+    "Could not create the Java Virtual Machine",
+    "Error: Could not find or load main class",
+    "Exception in thread \"main\"",
+    "java.lang.OutOfMemoryError",
+)
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+
+class LogRingBuffer:
+    # Последние max_lines строк вывода. Каждая строка получает сквозной
+    # номер, так что читатель забирает только новые строки через lines_since()
+    # и видит, сколько старых успело вытесниться.
+
+    def __init__(self, max_lines=LOG_BUFFER_LINES):
+        self._lock = threading.Lock()
+        self._lines = deque(maxlen=max_lines)
+        self._next = 0  # номер следующей строки
+
+    def append(self, line):
+        with self._lock:
+            self._lines.append(line)
+            self._next += 1
+
+    @property
+    def first(self):
+        with self._lock:
+            return self._next - len(self._lines)
+
+    def lines_since(self, seq):
+        # (номер самой старой сохранённой строки, строки начиная с max(seq, него))
+        with self._lock:
+            first = self._next - len(self._lines)
+            start = max(seq, first)
+            if start >= self._next:
+                return first, []
+            return first, list(self._lines)[start - first:]
+
+
+class GameProcess:
+    # Запущенный клиент: вывод читает обычный daemon-поток (не QThread) и
+    # складывает в кольцевой буфер; состояние меняется по строкам лога и коду
+    # выхода. Подписчики on_line/on_exit вызываются в этом потоке.
+
+    def __init__(self, command, cwd, name=""):
+        self.command = command
+        self.cwd = cwd
+        self.name = name
+        self.log = LogRingBuffer()
+        self.state = STATE_STARTING
+        self.returncode = None
+        self.crash_line = None
+        self.started_at = time.time()
+        self.ready_after = None
+        self._line_hooks = []
+        self._exit_hooks = []
+        self._proc = None
+
+    def add_line_hook(self, callback):
+        self._line_hooks.append(callback)
+
+    def add_exit_hook(self, callback):
+        self._exit_hooks.append(callback)
+
+    def start(self):
+        self._proc = subprocess.Popen(
+            self.command, cwd=self.cwd,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, encoding="utf-8", errors="replace"
+        )
+        threading.Thread(target=self._pump, name=f"game-log-{self.name}", daemon=True).start()
+        return self
+
+    @property
+    def pid(self):
+        return self._proc.pid if self._proc is not None else None
+
+    @property
+    def alive(self):
+        return self.state in (STATE_STARTING, STATE_RUNNING)
+
+    def _pump(self):
+        started = time.monotonic()
+        for line in self._proc.stdout:
+            line = line.rstrip("\r\n")
+            self.log.append(line)
+            if self.state == STATE_STARTING and any(marker in line for marker in STARTUP_MARKERS):
+                self.ready_after = time.monotonic() - started
+                self.state = STATE_RUNNING
+            if self.crash_line is None and any(marker in line for marker in CRASH_MARKERS):
+                self.crash_line = line
+            for callback in list(self._line_hooks):
+                try:
+                    callback(line)
+                except Exception as e:
+                    # Упавший обработчик отключаем, а поток чтения продолжает работу:
+                    # иначе игра навсегда осталась бы "starting"
+                    print("Ошибка обработчика вывода игры:", e)
+                    self._line_hooks.remove(callback)
+        self.returncode = self._proc.wait()
+        self.state = STATE_CRASHED if self.returncode != 0 or self.crash_line else STATE_EXITED
+        self.log.append(f"[SuperLauncher] Процесс завершился с кодом {self.returncode}")
+        for callback in self._exit_hooks:
+            try:
+                callback(self.returncode)
+            except Exception as e:
+                print("Ошибка обработчика завершения игры:", e)
+
+
+class ProcessSupervisor:
+    # Все запущенные клиенты. Ожидание процесса не держит ни QThread,
+    # ни поток запуска — UI опрашивает состояние и буфер лога по таймеру.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes = []
+
+    def spawn(self, command, cwd, name="", on_line=None, on_exit=None):
+        # Подписчики вешаются до старта, чтобы не пропустить первые строки
+        process = GameProcess(command, cwd, name)
+        if on_line is not None:
+            process.add_line_hook(on_line)
+        if on_exit is not None:
+            process.add_exit_hook(on_exit)
+        # В список попадает только запущенный процесс: если Popen упал (нет
+        # java), вечная запись "starting" заняла бы слот планировщика
+        process.start()
+        with self._lock:
+            self._processes.append(process)
+        self.forget_finished(KEEP_FINISHED)
+        return process
+
+    def processes(self):
+        with self._lock:
+            return list(self._processes)
+
+    def running(self):
+        return [process for process in self.processes() if process.alive]
+
+    def forget_finished(self, keep=0):
+        # Убирает завершённые игры, кроме keep последних, вместе с их буферами лога
+        with self._lock:
+            finished = [process for process in self._processes if not process.alive]
+            dropped = set(map(id, finished[:max(0, len(finished) - keep)]))
+            self._processes = [process for process in self._processes if id(process) not in dropped]
+
+
+def get_process_supervisor():
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is None:
+            _supervisor = ProcessSupervisor()
+        return _supervisor
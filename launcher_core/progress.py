@@ -0,0 +1,120 @@
+import threading
+import time
+
+DEFAULT_PUBLISH_RATE = 30  # обновлений UI в секунду
+
+
+class ProgressSnapshot:
+    __slots__ = ("label", "value", "maximum", "bytes_done", "bytes_total", "rate", "eta")
+
+    def __init__(self, label, value, maximum, bytes_done, bytes_total, rate, eta):
+        self.label = label
+        self.value = value
+        self.maximum = maximum
+        self.bytes_done = bytes_done
+        self.bytes_total = bytes_total
+        self.rate = rate  # байт/с
+        self.eta = eta  # секунд или None
+
+
+class ProgressAggregator:
+    # Собирает прогресс от любого числа рабочих потоков. Потоки только
+    # обновляют числа под блокировкой, а потребитель (UI) сам забирает снимок
+    # через poll() не чаще max_rate раз в секунду.
+
+    def __init__(self, max_rate=DEFAULT_PUBLISH_RATE):
+        self._lock = threading.Lock()
+        self.min_interval = 1.0 / max_rate
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._label = ""
+            self._value = 0
+            self._maximum = 0
+            self._items = {}  # ключ -> [скачано, всего]
+            self._done_bytes = 0
+            self._done_total = 0
+            self._changes = 0
+            self._published_changes = -1
+            self._last_publish = 0.0
+            self._rate_bytes = 0
+            self._rate_time = time.monotonic()
+            self._rate = 0.0
+
+    # Колбэки в формате minecraft_launcher_lib
+    def set_label(self, label):
+        with self._lock:
+            self._label = label
+            self._changes += 1
+
+    def set_value(self, value):
+        with self._lock:
+            self._value = value
+            self._changes += 1
+
+    def set_max(self, maximum):
+        with self._lock:
+            self._maximum = maximum
+            self._changes += 1
+
+    def report_bytes(self, key, done, total):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self._items[key] = [done, total or 0]
+            else:
+                item[0] = done
+                if total:
+                    item[1] = total
+            self._changes += 1
+
+    def finish(self, key):
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is not None:
+                self._done_bytes += item[0]
+                self._done_total += max(item[0], item[1])
+                self._changes += 1
+
+    def callback(self):
+        return {
+            "setStatus": self.set_label,
+            "setProgress": self.set_value,
+            "setMax": self.set_max,
+            "reportBytes": self.report_bytes,
+            "finishBytes": self.finish,
+        }
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot(time.monotonic())
+
+    def _snapshot(self, now):
+        bytes_done = self._done_bytes + sum(item[0] for item in self._items.values())
+        bytes_total = self._done_total + sum(item[1] for item in self._items.values())
+        elapsed = now - self._rate_time
+        if elapsed >= 0.25:
+            # Скользящее среднее скорости, чтобы цифры в UI не прыгали
+            instant = (bytes_done - self._rate_bytes) / elapsed
+            self._rate = instant if not self._rate else self._rate * 0.7 + instant * 0.3
+            self._rate_bytes = bytes_done
+            self._rate_time = now
+        eta = None
+        if self._rate > 0 and bytes_total > bytes_done:
+            eta = (bytes_total - bytes_done) / self._rate
+        return ProgressSnapshot(self._label, self._value, self._maximum,
+                                bytes_done, bytes_total, self._rate, eta)
+
+    def poll(self, force=False):
+        # Снимок, если что-то изменилось и прошло не меньше min_interval
+        now = time.monotonic()
+        with self._lock:
+            if not force:
+                if self._changes == self._published_changes:
+                    return None
+                if now - self._last_publish < self.min_interval:
+                    return None
+            self._published_changes = self._changes
+            self._last_publish = now
+            return self._snapshot(now)
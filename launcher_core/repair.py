@@ -0,0 +1,116 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .downloader import DownloadEngine, file_sha1_and_size
+from .install import finish_install, plan_install
+from .journal import invalidate_install_journals
+from .verified_index import get_verified_index
+
+
+class RepairReport:
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.corrupt = 0
+        self.missing = 0
+        self.repaired = 0
+        self.elapsed = 0.0
+
+    @property
+    def files_per_second(self):
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_second(self):
+        return self.bytes / (1024 * 1024) / self.elapsed if self.elapsed else 0.0
+
+
+def installed_versions(minecraft_directory):
+    versions_dir = os.path.join(minecraft_directory, "versions")
+    if not os.path.isdir(versions_dir):
+        return []
+    result = []
+    with os.scandir(versions_dir) as it:
+        for entry in it:
+            if entry.is_dir() and os.path.isfile(os.path.join(entry.path, f"{entry.name}.json")):
+                result.append(entry.name)
+    return sorted(result)
+
+
+def check_file(task):
+    # Возвращает (состояние, прочитано байт): "ok", "missing" или "corrupt".
+    # hashlib и чтение файла отпускают GIL, поэтому потоки реально
+    # занимают все ядра. Буфер потока общий с загрузчиком
+    try:
+        size = os.stat(task.path).st_size
+        if task.size is not None and size != task.size:
+            return "corrupt", 0
+        if task.sha1 is None:
+            return "ok", 0
+        digest, total = file_sha1_and_size(task.path)
+    except OSError:
+        return "missing", 0
+    return ("ok" if digest == task.sha1 else "corrupt"), total
+
+
+def repair_versions(minecraft_directory, version_ids=None, callback=None, workers=None, concurrency=None):
+    # Проверяет хэши всех файлов выбранных версий (или всех установленных)
+    # и перекачивает только повреждённые и отсутствующие
+    callback = callback or {}
+    set_status = callback.get("setStatus", lambda value: None)
+    set_progress = callback.get("setProgress", lambda value: None)
+    set_max = callback.get("setMax", lambda value: None)
+
+    report = RepairReport()
+    index = get_verified_index(minecraft_directory)
+    # Планируем без индекса: json версий и индексы ассетов тоже перепроверяются
+    plan_engine = DownloadEngine(concurrency)
+    plans = []
+    unique = {}
+    for version_id in version_ids or installed_versions(minecraft_directory):
+        plan = plan_install(minecraft_directory, version_id, plan_engine, callback)
+        # Ассеты у версий в основном общие — задачи сливаем сразу, а не
+        # держим списки всех планов до конца проверки
+        for task in plan.tasks:
+            unique.setdefault(task.path, task)
+        plan.tasks = []
+        plans.append(plan)
+
+    tasks = list(unique.values())
+    set_status("Verify files")
+    set_max(len(tasks))
+    set_progress(0)
+
+    broken = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 4) as pool:
+        futures = {pool.submit(check_file, task): task for task in tasks}
+        for done, future in enumerate(as_completed(futures), 1):
+            task = futures[future]
+            state, size = future.result()
+            report.files += 1
+            report.bytes += size
+            if state == "ok":
+                if task.sha1:
+                    index.mark_verified(task.path, task.sha1)
+            else:
+                index.forget(task.path)
+                broken.append(task)
+                if state == "missing":
+                    report.missing += 1
+                else:
+                    report.corrupt += 1
+            set_progress(done)
+    report.elapsed = time.perf_counter() - started
+    index.flush()
+
+    if broken:
+        # Журналы этих версий подтверждали установку, которой уже не было
+        invalidate_install_journals(minecraft_directory, [plan.version_id for plan in plans])
+        engine = DownloadEngine(concurrency, index=index)
+        engine.download_all(broken, callback, status="Download broken files")
+        report.repaired = len(broken)
+    for plan in plans:
+        finish_install(minecraft_directory, plan, callback)
+    return report
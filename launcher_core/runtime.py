@@ -0,0 +1,145 @@
+import os
+import sys
+import threading
+
+from .downloader import DownloadEngine, DownloadTask
+from .files import read_json
+from .install import get_jvm_platform, runtime_java_path
+from .manifest import ManifestCache
+from .paths import get_launcher_directory
+from .verified_index import get_verified_index
+
+JAVA_RUNTIME_MANIFEST_URL = (
+    "https://launchermeta.mojang.com/v1/products/java-runtime/"
+    "2ec0cc96c44e5a76b9c8b7c39df7210883d12871/all.json"
+)
+RUNTIME_MANIFEST_TTL = 24 * 3600
+
+_caches = {}
+_install_locks = {}
+_locks_lock = threading.Lock()
+
+
+def get_runtime_manifest_cache(minecraft_directory):
+    with _locks_lock:
+        cache = _caches.get(minecraft_directory)
+        if cache is None:
+            cache = ManifestCache(get_launcher_directory(minecraft_directory), JAVA_RUNTIME_MANIFEST_URL,
+                                  RUNTIME_MANIFEST_TTL, filename="java_runtime_manifest.json")
+            _caches[minecraft_directory] = cache
+        return cache
+
+
+def _install_lock(runtime_dir):
+    # Один компонент ставится только одним потоком, остальные ждут и
+    # используют уже установленный рантайм
+    with _locks_lock:
+        lock = _install_locks.get(runtime_dir)
+        if lock is None:
+            lock = threading.Lock()
+            _install_locks[runtime_dir] = lock
+        return lock
+
+
+def runtime_platform_directory(minecraft_directory, component):
+    return os.path.join(minecraft_directory, "runtime", component, get_jvm_platform())
+
+
+def runtime_home(minecraft_directory, component):
+    return os.path.join(runtime_platform_directory(minecraft_directory, component), component)
+
+
+def get_runtime_info(minecraft_directory, component):
+    # Запись манифеста для компонента на этой платформе или None
+    entries = get_runtime_manifest_cache(minecraft_directory).get().get(get_jvm_platform(), {}).get(component)
+    return entries[0] if entries else None
+
+
+def installed_runtime_version(minecraft_directory, component):
+    try:
+        with open(os.path.join(runtime_platform_directory(minecraft_directory, component), ".version"),
+                  encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _runtime_ready(minecraft_directory, component, java_path):
+    # .version пишется последним, так что вместе с java он означает полную установку
+    return installed_runtime_version(minecraft_directory, component) is not None and os.path.isfile(java_path)
+
+
+def install_runtime(minecraft_directory, component, callback=None, concurrency=None, priority=None, throttle=None):
+    # Ставит рантайм Mojang в runtime/<компонент>/<платформа>/<компонент> —
+    # туда же, куда minecraft_launcher_lib, так что уже скачанные им рантаймы
+    # подхватываются. Все версии с одним компонентом используют одну копию.
+    # Возвращает путь к java или None, если для платформы рантайма нет.
+    # Манифест рантаймов запрашивается, только если локальной установки нет.
+    callback = callback or {}
+    java_path = runtime_java_path(minecraft_directory, component)
+    if _runtime_ready(minecraft_directory, component, java_path):
+        return java_path
+    info = get_runtime_info(minecraft_directory, component)
+    if info is None:
+        print(f"Рантайм {component} недоступен для платформы {get_jvm_platform()}")
+        return java_path if os.path.isfile(java_path) else None
+
+    platform_dir = runtime_platform_directory(minecraft_directory, component)
+    home = runtime_home(minecraft_directory, component)
+    version_name = info.get("version", {}).get("name", "")
+    with _install_lock(platform_dir):
+        if _runtime_ready(minecraft_directory, component, java_path):
+            return java_path
+
+        engine = DownloadEngine(concurrency, index=get_verified_index(minecraft_directory),
+                                priority=priority, throttle=throttle)
+        try:
+            manifest_info = info["manifest"]
+            manifest_path = os.path.join(platform_dir, f"{component}.json")
+            engine.fetch(DownloadTask(manifest_info["url"], manifest_path,
+                                      manifest_info.get("sha1"), manifest_info.get("size")))
+            files = read_json(manifest_path, {}).get("files", {})
+
+            tasks = []
+            executables = []
+            links = []
+            for name, entry in files.items():
+                path = os.path.join(home, name)
+                kind = entry.get("type")
+                if kind == "directory":
+                    os.makedirs(path, exist_ok=True)
+                elif kind == "file":
+                    raw = entry["downloads"]["raw"]
+                    tasks.append(DownloadTask(raw["url"], path, raw.get("sha1"), raw.get("size")))
+                    if entry.get("executable"):
+                        executables.append(path)
+                elif kind == "link":
+                    links.append((path, entry["target"]))
+            engine.download_all(tasks, callback, status=f"Download Java runtime {component}")
+        finally:
+            engine.flush()
+
+        if sys.platform != "win32":
+            for path in executables:
+                os.chmod(path, os.stat(path).st_mode | 0o111)
+            for path, target in links:
+                if not os.path.lexists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.symlink(target, path)
+
+        with open(os.path.join(platform_dir, ".version"), "w", encoding="utf-8") as f:
+            f.write(version_name)
+    return java_path
+
+
+def installed_runtime_executables(minecraft_directory):
+    # java из всех установленных рантаймов Mojang (для выбора в режиме "java")
+    runtime_dir = os.path.join(minecraft_directory, "runtime")
+    if not os.path.isdir(runtime_dir):
+        return []
+    result = []
+    for component in os.listdir(runtime_dir):
+        path = runtime_java_path(minecraft_directory, component)
+        if os.path.isfile(path):
+            result.append(path)
+    return result
@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import threading
+
+from .paths import get_launcher_directory
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class VerifiedIndex:
+    # Постоянный индекс проверенных файлов: путь -> (размер, mtime_ns, sha1).
+    # Если размер и mtime файла не менялись с момента проверки, хэш заново
+    # не считается. Индекс целиком читается в память одним запросом,
+    # новые записи сбрасываются в SQLite пачкой через flush().
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._entries = None
+        self._pending = {}
+        self._removed = set()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha1 TEXT NOT NULL)"
+        )
+        return conn
+
+    def _load(self):
+        if self._entries is None:
+            entries = {}
+            try:
+                conn = self._connect()
+                try:
+                    for path, size, mtime_ns, sha1 in conn.execute("SELECT path, size, mtime_ns, sha1 FROM files"):
+                        entries[path] = (size, mtime_ns, sha1)
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print("Индекс проверенных файлов повреждён, начинаем заново:", e)
+            self._entries = entries
+        return self._entries
+
+    def is_verified(self, path, sha1, size=None):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if size is not None and st.st_size != size:
+            return False
+        with self._lock:
+            entry = self._load().get(path)
+        return entry == (st.st_size, st.st_mtime_ns, sha1)
+
+    def mark_verified(self, path, sha1):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        entry = (st.st_size, st.st_mtime_ns, sha1)
+        with self._lock:
+            self._load()[path] = entry
+            self._pending[path] = entry
+            self._removed.discard(path)
+
+    def forget(self, path):
+        with self._lock:
+            if self._load().pop(path, None) is not None:
+                self._removed.add(path)
+            self._pending.pop(path, None)
+
+    def flush(self):
+        with self._lock:
+            if not self._pending and not self._removed:
+                return
+            pending = [(path, *entry) for path, entry in self._pending.items()]
+            removed = [(path,) for path in self._removed]
+            self._pending = {}
+            self._removed = set()
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("DELETE FROM files WHERE path = ?", removed)
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO files (path, size, mtime_ns, sha1) VALUES (?, ?, ?, ?)", pending
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print("Не удалось сохранить индекс проверенных файлов:", e)
+
+
+def get_verified_index(minecraft_directory):
+    with _indexes_lock:
+        index = _indexes.get(minecraft_directory)
+        if index is None:
+            index = VerifiedIndex(os.path.join(get_launcher_directory(minecraft_directory), "verified_files.sqlite3"))
+            _indexes[minecraft_directory] = index
+        return index
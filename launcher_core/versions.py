@@ -0,0 +1,203 @@
+import os
+import threading
+from dataclasses import dataclass
+
+from .files import read_json
+from .manifest import get_manifest_cache
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+@dataclass
+class VersionEntry:
+    id: str
+    type: str = "unknown"
+    release_time: str = ""
+    installed: bool = False
+    loader: str = "vanilla"
+    url: str = ""
+    inherits_from: str = ""
+    java_major: int = 0
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "type": self.type,
+            "releaseTime": self.release_time,
+            "installed": self.installed,
+            "loader": self.loader,
+        }
+
+
+def detect_loader(version_id, data):
+    # Определяем ядро по id и mainClass из json версии
+    lowered = version_id.lower()
+    main_class = (data or {}).get("mainClass", "")
+    if "neoforge" in lowered:
+        return "neoforge"
+    if "quilt" in lowered or main_class.startswith("org.quiltmc"):
+        return "quilt"
+    if "fabric" in lowered or main_class.startswith("net.fabricmc"):
+        return "fabric"
+    if "forge" in lowered or main_class.startswith(("cpw.mods", "net.minecraftforge")):
+        return "forge"
+    if "optifine" in lowered:
+        return "optifine"
+    if (data or {}).get("inheritsFrom"):
+        return "modded"
+    return "vanilla"
+
+
+class VersionCatalog:
+    # Индекс версий: удалённые из манифеста и локальные из versions/ лежат
+    # в словарях по id. Локальная часть пересканируется только когда меняется
+    # mtime папки versions/, а json перечитывается только у новых папок и у тех,
+    # чей json сменил mtime (перезапись файла mtime папки не трогает).
+
+    def __init__(self, minecraft_directory):
+        self.versions_dir = os.path.join(minecraft_directory, "versions")
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._remote = {}
+        self._local = {}  # id -> (mtime_ns json или None, VersionEntry)
+        self._versions_mtime = None
+        self._merged = None
+
+    def update_remote(self, manifest):
+        with self._lock:
+            if manifest is self._manifest:
+                return False
+            self._manifest = manifest
+            self._remote = {
+                v["id"]: VersionEntry(
+                    id=v["id"],
+                    type=v.get("type", "unknown"),
+                    release_time=v.get("releaseTime", ""),
+                    url=v.get("url", ""),
+                )
+                for v in manifest.get("versions", [])
+            }
+            self._merged = None
+            return True
+
+    def _read_local(self, version_id):
+        json_path = os.path.join(self.versions_dir, version_id, f"{version_id}.json")
+        try:
+            mtime = os.stat(json_path).st_mtime_ns
+        except OSError:
+            return None, VersionEntry(id=version_id, installed=True, loader=detect_loader(version_id, None))
+        data = read_json(json_path, {})
+        return mtime, VersionEntry(
+            id=version_id,
+            type=data.get("type", "unknown"),
+            release_time=data.get("releaseTime", ""),
+            installed=True,
+            loader=detect_loader(version_id, data),
+            inherits_from=data.get("inheritsFrom", ""),
+            java_major=data.get("javaVersion", {}).get("majorVersion", 0),
+        )
+
+    def refresh_local(self):
+        with self._lock:
+            try:
+                mtime = os.stat(self.versions_dir).st_mtime_ns
+            except OSError:
+                changed = bool(self._local)
+                self._local = {}
+                self._versions_mtime = None
+                if changed:
+                    self._merged = None
+                return changed
+
+            changed = False
+            if mtime != self._versions_mtime:
+                folders = set()
+                with os.scandir(self.versions_dir) as it:
+                    for entry in it:
+                        if entry.is_dir():
+                            folders.add(entry.name)
+                for version_id in list(self._local):
+                    if version_id not in folders:
+                        del self._local[version_id]
+                        changed = True
+                for version_id in folders:
+                    if version_id not in self._local:
+                        self._local[version_id] = self._read_local(version_id)
+                        changed = True
+                self._versions_mtime = mtime
+
+            # Json мог появиться или перезаписаться — mtime versions/ это не меняет,
+            # поэтому сверяем mtime каждого json (один stat на версию)
+            for version_id, (json_mtime, _) in list(self._local.items()):
+                json_path = os.path.join(self.versions_dir, version_id, f"{version_id}.json")
+                try:
+                    current = os.stat(json_path).st_mtime_ns
+                except OSError:
+                    current = None
+                if current != json_mtime:
+                    self._local[version_id] = self._read_local(version_id)
+                    changed = True
+
+            if changed:
+                self._merged = None
+            return changed
+
+    def invalidate(self, version_id=None):
+        # Принудительно перечитать json версии (например, после установки)
+        with self._lock:
+            if version_id is None:
+                self._local = {}
+                self._versions_mtime = None
+            elif version_id in self._local:
+                self._local[version_id] = self._read_local(version_id)
+            self._merged = None
+
+    def refresh(self, manifest_ttl=None):
+        try:
+            cache = get_manifest_cache(os.path.dirname(self.versions_dir), manifest_ttl)
+            self.update_remote(cache.get())
+        except Exception as e:
+            print("Онлайн-версии недоступны, используем локальные:", e)
+        self.refresh_local()
+        return self.entries()
+
+    def entries(self):
+        with self._lock:
+            if self._merged is None:
+                merged = []
+                for version_id, entry in self._remote.items():
+                    local = self._local.get(version_id)
+                    if local is not None:
+                        entry.installed = True
+                        entry.loader = local[1].loader
+                    else:
+                        entry.installed = False
+                    merged.append(entry)
+                local_only = [e for i, (_, e) in self._local.items() if i not in self._remote]
+                local_only.sort(key=lambda e: e.release_time, reverse=True)
+                merged.extend(local_only)
+                self._merged = merged
+            return list(self._merged)
+
+    def get(self, version_id):
+        with self._lock:
+            local = self._local.get(version_id)
+            if local is not None:
+                return local[1]
+            return self._remote.get(version_id)
+
+
+def get_version_catalog(minecraft_directory):
+    with _catalogs_lock:
+        catalog = _catalogs.get(minecraft_directory)
+        if catalog is None:
+            catalog = VersionCatalog(minecraft_directory)
+            _catalogs[minecraft_directory] = catalog
+        return catalog
+
+
+# Возвращает все версии без фильтрации (Vanilla + Snapshots + Fabric + Forge)
+def get_all_versions(minecraft_directory, manifest_ttl=None):
+    catalog = get_version_catalog(minecraft_directory)
+    return [entry.as_dict() for entry in catalog.refresh(manifest_ttl)]